@@ -1,13 +1,11 @@
+import time
+START = time.perf_counter()  # Reference time for the startup milestones
 from tkinter import *
 from tkinter import filedialog
 from tkinter import messagebox
-import pygame
-import numpy as np
+import argparse
 import os
-import base64
-import gtransform
-from orient import orient
-from drawlines import draw_lines
+import sys
 
 
 '''
@@ -19,9 +17,18 @@ Features:
  - Reads object face geometry and associated outward normal vectors from STL files
  - Centers the object and rescales to fit appropriately within the viewing/clipping window
  - User can select wireframe, no hidden lines, or shaded hidden line views when displaying the object on screen
+ - Feature edge view only draws edges sharper than a set angle and silhouette edges (far fewer lines on dense meshes)
  - Allows for user selection of isometric, dimetric, and trimetric views with user-defined settings popup
  - Menu for quick selection of the 6 standard orthographic views of the object
  - Allows for zooming, rotation and panning of the object with onscreen controls and keyboard bindings
+ - Opens an STL or scene file given on the command line as soon as the window is shown
+ - Highlights the face under the mouse and shows the index, normal and vertices of a clicked face
+ - Cross section view sweeping a cutting plane along X, Y, Z or any normal, optionally with the clipped object
+ - Records sessions of opened files, transformations, settings changes and cross section steps for headless
+   replay (session.py)
+
+Startup is kept fast by importing NumPy, PyGame and the geometry modules only when the first model is opened
+and by loading the icons from PNG image data in memory. Run with --timing to print the startup milestones.
 
 Evan Chodora, 2018
 https://github.com/evanchodora/viewer
@@ -32,14 +39,35 @@ echodor@clemson.edu
 # Class to draw an STL object from an ASCII STL file
 class DrawObject:
         pxarray = []  # Initialize the pixel array variable to empty for the class
-
-        def __init__(self):
+        scene = None  # Scene of several model instances (None when a single STL file is displayed)
+        edge_counts = None  # Edges drawn and camera-facing triangle edges of the last feature edge view
+        view_state = None  # Geometry, normals and view matrix of the object on screen (view space before flattening)
+        bvh = None  # Bounding volume hierarchy for picking faces, built the first time a face is picked
+        fitted = None  # View state the bounding volume hierarchy was last refit to
+        hover = -1  # Highlighted face under the mouse (-1 for none)
+        section = None  # Sweep index of the cross section view, built for the last sweep direction
+
+        def __init__(self, filename=None, scene=None):
+                if scene is not None:
+                        # Fit the whole scene of instances within the display window
+                        self.scene = scene
+                        self.scene.fit_window(embed_w, embed_h)
+                        return
                 # Initiate new Loader class and run load_stl with the selected file
                 self.model = Loader()
-                self.model.load_stl(window.filename)
+                self.model.load_stl(filename)
 
         # Function to plot the initial object after loading
         def initial_plot(self, loc):
+                if self.scene is not None:
+                        # Remove any scene transformations and project every visible instance
+                        self.scene.reset()
+                        plot_geometry = self.scene.draw(persp.get(), fz.get(), phi.get(), theta.get(), view.get(),
+                                                        embed_w, embed_h, feature_angle=feature_angle.get())
+                        if self.scene.edge_counts is not None:
+                                self.edge_counts = self.scene.edge_counts
+                        self.plot_points(loc, plot_geometry)
+                        return
 
                 # Copy original geometry to new internal variable to be used for transformations (keep original
                 # geometry unchanged for use in displaying the orthographic views of the object)
@@ -47,28 +75,26 @@ class DrawObject:
                 # Apply selected perspective with appropriate settings of fz, phi, and theta
                 plot_geometry, camera = gtransform.perspective(persp.get(), self.model.coordinates, fz.get(), phi.get(),
                                                                theta.get())
+                rot, _ = gtransform.perspective_matrix(persp.get(), fz.get(), phi.get(), theta.get())
+                self.view_state = (self.model.coordinates, self.model.normals, rot)
                 # Draw lines between points and clip to viewing window based on window height and width
-                plot_geometry = draw_lines(plot_geometry, self.model.normals, camera, view.get(), embed_w, embed_h)
-
-                # Clear pixel array to white and then change each pixel color based on the XY pixel map
-                self.pxarray = pygame.PixelArray(loc)
-                self.pxarray[:][:] = (255, 255, 255)
-                for point in range(0, plot_geometry.shape[0]):
-                        x = int(embed_w/2 + plot_geometry[point, 0])  # X coordinate (0,0 of screen is top left)
-                        y = int(embed_h/2 + plot_geometry[point, 1])  # Y coordinate (0,0 of screen is top left)
-                        # Plot all front facing lines and back facing when wireplot is selected
-                        if plot_geometry[point, 2] == 1 or view.get() == 'wire':
-                                self.pxarray[x][y] = (0, 0, 0)  # Color = black
-                        # Plot grey lines only if grey lines are selected and the line is not already plotted black
-                        elif plot_geometry[point, 2] == 0 and view.get() == 'grey' and self.pxarray[x][y] != 0:
-                                self.pxarray[x][y] = (210, 210, 210)  # Color = grey
-                # Plot pixel array to screen and refresh window/GUI
-                pygame.surfarray.blit_array(loc, self.pxarray)
-                pygame.display.flip()
-                window.update()
+                plot_geometry = self.draw_lines(plot_geometry, self.model.normals, camera)
+
+                self.plot_points(loc, plot_geometry)
 
         # Function to re-plot the object with a specified transformation/perspective
         def plot_transform(self, loc, transtype, data):
+                if self.scene is not None:
+                        # Orthographic views are drawn from the original scene, other transforms accumulate
+                        if transtype != 'ortho':
+                                self.scene.transform(transtype, data)
+                        new_geometry = self.scene.draw(persp.get(), fz.get(), phi.get(), theta.get(), view.get(),
+                                                       embed_w, embed_h, data if transtype == 'ortho' else None,
+                                                       feature_angle.get())
+                        if self.scene.edge_counts is not None:
+                                self.edge_counts = self.scene.edge_counts
+                        self.plot_points(loc, new_geometry)
+                        return
 
                 if transtype == 'ortho':
                         # Transform the original geometry according to the selected orthographic view
@@ -76,8 +102,8 @@ class DrawObject:
                                                                          self.model.normal, transtype,
                                                                          data)
                         # Draw lines between points and clip to viewing window based on window height and width
-                        new_geometry = draw_lines(new_geometry, new_normals, [0, 0, 1], view.get(), embed_w,
-                                                  embed_h)
+                        new_geometry = self.draw_lines(new_geometry, new_normals, [0, 0, 1])
+                        self.view_state = (self.model.geometry, self.model.normal, gtransform.ortho_matrix(data)[1])
                 else:
                         # Transform geometry based on the selected transformation
                         self.model.coordinates, self.model.normals = gtransform.transform(self.model.coordinates,
@@ -86,26 +112,115 @@ class DrawObject:
                         # Apply selected perspective with appropriate settings of fz, phi, and theta
                         new_geometry, camera = gtransform.perspective(persp.get(), self.model.coordinates,
                                                                       fz.get(), phi.get(), theta.get())
+                        rot, _ = gtransform.perspective_matrix(persp.get(), fz.get(), phi.get(), theta.get())
+                        self.view_state = (self.model.coordinates, self.model.normals, rot)
                         # Draw lines between points and clip to viewing window
-                        new_geometry = draw_lines(new_geometry, self.model.normals, camera,
-                                                  view.get(), embed_w, embed_h)
+                        new_geometry = self.draw_lines(new_geometry, self.model.normals, camera)
+
+                self.plot_points(loc, new_geometry)
 
-                # Clear pixel array to white and then change each pixel color based on the XY pixel map
-                self.pxarray[:][:] = (255, 255, 255)
-                for point in range(0, new_geometry.shape[0]):
-                        x = int(embed_w/2 + new_geometry[point, 0])  # X coordinate (0,0 of screen is top left)
-                        y = int(embed_h/2 + new_geometry[point, 1])  # Y coordinate (0,0 of screen is top left)
-                        # Plot all front facing lines and back facing when wireplot is selected
-                        if new_geometry[point, 2] == 1 or view.get() == 'wire':
-                                self.pxarray[x][y] = (0, 0, 0)  # Color = black
-                        # Plot grey lines only if grey lines are selected and the line is not already plotted black
-                        elif new_geometry[point, 2] == 0 and view.get() == 'grey' and self.pxarray[x][y] != 0:
-                                self.pxarray[x][y] = (210, 210, 210)  # Color = grey
+        # Function to draw the lines of the projected object for the selected view type
+        def draw_lines(self, plot_geometry, normals, camera):
+                if view.get() != 'edge':
+                        # Draw lines between points and clip to viewing window based on window height and width
+                        return draw_lines(plot_geometry, normals, camera, view.get(), embed_w, embed_h)
+
+                # Only draw the feature edges above the angle threshold and the silhouette edges
+                edges = self.model.edge_set()
+                visible, front = edges.visible(normals, camera, feature_angle.get())
+                self.edge_counts = (int(visible.sum()), 3*int(front.sum()))
+                return draw_edges(plot_geometry, edges.points[visible], embed_w, embed_h)
+
+        # Function to plot the XY pixel map of line points from draw_lines to the screen
+        def plot_points(self, loc, plot_geometry):
+                # Change each pixel color of a white pixel array based on the XY pixel map
+                self.pxarray = rasterize(plot_geometry, view.get(), embed_w, embed_h)
+                if view.get() == 'edge' and self.edge_counts is not None:
+                        # Report the reduction compared to the camera-facing triangle edges of the hidden line view
+                        drawn, total = self.edge_counts
+                        status.configure(text="Opened: %s - %d feature and silhouette edges drawn instead of %d "
+                                              "triangle edges (%.0f%% fewer)"
+                                              % (window.filename, drawn, total,
+                                                 100.0*(total - drawn)/total if total > 0 else 0.0))
+                elif self.edge_counts is not None:
+                        # Remove the edge report after switching to another view type
+                        status.configure(text="Opened: " + window.filename)
+                        self.edge_counts = None
+                self.hover = -1  # Any face highlight is cleared by the new pixel array
                 # Plot pixel array to screen and refresh window/GUI
                 pygame.surfarray.blit_array(loc, self.pxarray)
                 pygame.display.flip()
                 window.update()
 
+        # Function to find the face under a screen position (pixels from the top left), -1 if there is none
+        def pick(self, x, y):
+                if self.scene is not None or self.view_state is None:
+                        return -1  # Faces are only picked on single STL objects
+                if self.bvh is None:
+                        self.bvh = FaceBVH(self.model.geometry)
+                if self.fitted is not self.view_state:
+                        # Refit the bounds to the view space geometry after the object was transformed
+                        geometry, _, mat = self.view_state
+                        self.bvh.refit(geometry.dot(mat))
+                        self.fitted = self.view_state
+                return self.bvh.pick(x - embed_w/2, y - embed_h/2)
+
+        # Function to plot the last pixel array with a face filled in with the highlight color
+        def plot_highlight(self, loc, face):
+                pixels = self.pxarray.copy()
+                if face >= 0:
+                        x, y = face_pixels(self.bvh.view[3*face:3*face+3], embed_w, embed_h)
+                        white = (pixels[x, y] == 255).all(axis=1)  # Keep the lines drawn over the face
+                        pixels[x[white], y[white]] = (255, 200, 120)  # Color = light orange
+                pygame.surfarray.blit_array(loc, pixels)
+                pygame.display.flip()
+
+        # Function to plot the cross section where a plane cuts the object at a position (0 to 1) along a normal
+        def plot_section(self, loc, normal, position, clipped):
+                if self.scene is not None or self.view_state is None:
+                        return  # Sections are only cut through single STL objects
+                self.pxarray, _, cut = self.section_pixels(normal, position, clipped)
+                status.configure(text="Opened: %s - section at %.0f%% cuts %d faces"
+                                      % (window.filename, 100*position, cut))
+                self.hover = -1
+                pygame.surfarray.blit_array(loc, self.pxarray)
+                pygame.display.flip()
+                window.update()
+
+        # Function to draw the cross section of a single STL object, returns the pixel array, the number of line
+        # points drawn and the number of faces cut
+        def section_pixels(self, normal, position, clipped):
+                normal = np.asarray(normal, dtype=float)/np.linalg.norm(normal)
+                if self.section is None or not np.array_equal(self.section.normal, normal):
+                        self.section = SweepIndex(self.model.geometry, normal)  # Built once per sweep direction
+                offset = self.section.low + position*(self.section.high - self.section.low)
+                # Place the section on the object as currently shown (view space normals face the camera along -Z)
+                geometry, normals, mat = self.view_state
+                project = mat.dot(gtransform.FLAT)
+
+                model_points = np.zeros((0, 3), dtype=int)
+                if clipped:
+                        # Draw the faces entirely behind the plane for the selected view type
+                        faces = self.section.behind(offset)
+                        rows = (3*faces[:, None] + [0, 1, 2]).reshape(-1)
+                        model_points = draw_lines(geometry[rows].dot(project), normals[faces].dot(mat), [0, 0, 1],
+                                                  view.get(), embed_w, embed_h)
+                points, pairs = contour(geometry, self.section.cut(offset))
+                section_points = draw_edges(points.dot(project), pairs, embed_w, embed_h)
+
+                pixels = rasterize(model_points, view.get(), embed_w, embed_h)
+                section_lines = rasterize(section_points, 'wire', embed_w, embed_h)[:, :, 0] == 0
+                pixels[section_lines] = (220, 0, 0)  # Color = red
+                return pixels, model_points.shape[0] + section_points.shape[0], pairs.shape[0]
+
+        # Function to re-plot the object in its current view (after the cross section view is closed)
+        def replot(self, loc):
+                if self.scene is not None or self.view_state is None:
+                        return
+                geometry, normals, mat = self.view_state
+                plot_geometry = self.draw_lines(geometry.dot(mat).dot(gtransform.FLAT), normals.dot(mat), [0, 0, 1])
+                self.plot_points(loc, plot_geometry)
+
 
 # STL file loader class
 class Loader:
@@ -113,170 +228,188 @@ class Loader:
         geometry = []
         normal = []
         name = []
-        normal_face = []
+        edges = None  # Edge adjacency and dihedral angles for the feature edge view, built when first drawn
 
         # Load ASCII STL File (no Binary STLs - based on project requirements)
         def load_stl(self, filename):
-                self.geometry = []  # Clear previous geometry data
-                self.name = []  # Clear previous STL model name
-                self.normal = []  # Clear previous STL normal data
-                fp = open(filename, 'r')  # Open and read selected file into memory
-
-                # Loop over each line in the STL file
-                for line in fp.readlines():
-                        parts = line.split()  # Split line into parts by spaces
-                        if len(parts) > 0:
-                                # Start of filename, store embedded filename
-                                if parts[0] == 'solid':
-                                        self.name = line[6:-1]
-                                # Beginning of a new face - store normals and begin new triangle variable
-                                if parts[0] == 'facet':
-                                        triangle = []
-                                        # Select face normal components
-                                        self.normal_face = (float(parts[2]), float(parts[3]), float(parts[4]), 1)
-                                # Store all the vertex points in 'triangle'
-                                if parts[0] == 'vertex':
-                                        triangle.append((float(parts[1]), float(parts[2]), float(parts[3]), 1))
-                                # End of face - append new face to the model data
-                                if parts[0] == 'endloop':
-                                        self.geometry.append([triangle[0], triangle[1], triangle[2]])
-                                        self.normal.append(self.normal_face)
-                fp.close()
-                # Convert lists to numpy arrays of the correct dimensions (Nx4 matrices)
-                self.normal = np.asarray(self.normal).reshape((-1, 4))
-                self.geometry = np.asarray(self.geometry).reshape((-1, 4))
-                self.geometry = orient(self.geometry, embed_w, embed_h)  # Orient object geometry in screen space
-                window.title("STL Viewer Application - " + self.name)  # Put filename in the GUI header
+                # Read the face geometry and normals, replacing any previously loaded model data
+                self.name, self.geometry, self.normal = read_stl(filename)
+                self.orient = orient_matrix(self.geometry, embed_w, embed_h)
+                self.geometry = self.geometry.dot(self.orient)  # Orient object geometry in screen space
+                self.edges = None
+
+        # Return the edges of the object for the feature edge view (found once, the first time they are needed)
+        def edge_set(self):
+                if self.edges is None:
+                        self.edges = EdgeSet(self.geometry)
+                return self.edges
+
+        # Describe a face with its normal and vertices in the coordinates of the STL file
+        def face_info(self, face):
+                points = self.geometry[3*face:3*face+3].dot(np.linalg.inv(self.orient))
+                text = "Face %d: normal (%g, %g, %g)" % ((face,) + tuple(self.normal[face, 0:3]))
+                return text + ", vertices " + ", ".join("(%g, %g, %g)" % tuple(p[0:3]) for p in points)
 
 
 # Class to create a perspective settings popup dialog box for user input
 class SettingsDialog:
     def __init__(self, parent):
         top = self.top = Toplevel(parent)  # Use Tkinter top for a separate popup GUI
-        top.geometry("240x200")  # Window dimensions
+        top.geometry("240x250")  # Window dimensions
         top.resizable(0, 0)  # Un-resizable
         top.title('Perspective')  # Window title
 
-        # Code to assign an icon to the settings popup box using base64 stored image
-        icon = \
-            "AAABAAEAICAAAAEAIACoEAAAFgAAACgAAAAgAAAAQAAAAAEAIAAAAAAAABAAANcNAADXDQAAAAAAAAAA\
-            AAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAZwAA\
-            AOkAAAD5AAAA+QAAAOUAAABVAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAA\
-            AAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAA\
-            AAcAAACjAAAA/wAAAP8AAAD/AAAA/wAAAJAAAAABAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAA\
-            AAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAA\
-            AAAAAAAAAAAAHQAAANAAAAD/AAAA/wAAAP8AAAD/AAAAwwAAABYAAAAAAAAAAAAAAAAAAAAAAAAAAQAA\
-            AAQAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAADIAAACGAAAAQgAA\
-            AAMAAAAAAAAAAAAAAAwAAACEAAAA+wAAAP8AAAD/AAAA/wAAAP8AAAD5AAAAgAAAAA0AAAAAAAAAAAAA\
-            AAoAAABcAAAAlgAAADAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAzAAAAyQAA\
-            AP8AAADjAAAAiwAAAFgAAABgAAAApwAAAPUAAAD/AAAA/wAAAP8AAAD/AAAA/wAAAP8AAAD1AAAArgAA\
-            AHAAAABvAAAApwAAAPEAAAD/AAAAyAAAADMAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAMAAA\
-            AMgAAAD/AAAA/wAAAP8AAAD+AAAA9wAAAPkAAAD/AAAA/wAAAP8AAAD/AAAA/wAAAP8AAAD/AAAA/wAA\
-            AP8AAAD/AAAA/QAAAP0AAAD/AAAA/wAAAP8AAAD/AAAAygAAADIAAAAAAAAAAAAAAAAAAAAAAAAAAAAA\
-            AAIAAACQAAAA/wAAAP8AAAD/AAAA/wAAAP8AAAD/AAAA/wAAAP8AAAD/AAAA/wAAAP8AAAD/AAAA/wAA\
-            AP8AAAD/AAAA/wAAAP8AAAD/AAAA/wAAAP8AAAD/AAAA/wAAAP8AAAD/AAAAhQAAAAAAAAAAAAAAAAAA\
-            AAAAAAAAAAAAAAAAAFQAAADuAAAA/wAAAP8AAAD/AAAA/wAAAP8AAAD/AAAA/wAAAP8AAAD/AAAA/wAA\
-            AP8AAAD/AAAA/wAAAP8AAAD/AAAA/wAAAP8AAAD/AAAA/wAAAP8AAAD/AAAA/wAAAOAAAAA/AAAAAAAA\
-            AAAAAAAAAAAAAAAAAAAAAAAAAAAABgAAAJwAAAD/AAAA/wAAAP8AAAD/AAAA/wAAAP8AAAD/AAAA/wAA\
-            AP8AAAD/AAAA/wAAAP8AAAD/AAAA/wAAAP8AAAD/AAAA/wAAAP8AAAD/AAAA/wAAAP8AAAD/AAAAhgAA\
-            AAEAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAZgAAAPwAAAD/AAAA/wAAAP8AAAD/AAAA/wAA\
-            AP8AAAD/AAAA/wAAAP8AAAD/AAAA/wAAAP8AAAD/AAAA/wAAAP8AAAD/AAAA/wAAAP8AAAD/AAAA/wAA\
-            APUAAABTAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAABsAAAA/QAAAP8AAAD/AAAA/wAA\
-            AP8AAAD/AAAA/wAAAP8AAAD2AAAA1gAAAK8AAACtAAAA0wAAAPUAAAD/AAAA/wAAAP8AAAD/AAAA/wAA\
-            AP8AAAD/AAAA+AAAAFwAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAADgAAAK0AAAD/AAAA/wAA\
-            AP8AAAD/AAAA/wAAAP8AAAD/AAAA2AAAAGUAAAAaAAAACgAAAAoAAAAZAAAAXwAAANQAAAD/AAAA/wAA\
-            AP8AAAD/AAAA/wAAAP8AAAD/AAAApgAAAAwAAAAAAAAAAAAAAAAAAAAAAAAAAgAAABYAAACBAAAA9gAA\
-            AP8AAAD/AAAA/wAAAP8AAAD/AAAA/wAAANkAAAA6AAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAANAAA\
-            ANQAAAD/AAAA/wAAAP8AAAD/AAAA/wAAAP8AAAD1AAAAhAAAABsAAAAGAAAAAAAAAFQAAACUAAAAxwAA\
-            APgAAAD/AAAA/wAAAP8AAAD/AAAA/wAAAP8AAAD4AAAAagAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAA\
-            AAAAAAAAAAAAYAAAAPYAAAD/AAAA/wAAAP8AAAD/AAAA/wAAAP8AAAD5AAAA0AAAAKQAAABnAAAA4AAA\
-            AP8AAAD/AAAA/wAAAP8AAAD/AAAA/wAAAP8AAAD/AAAA/wAAAN0AAAAfAAAAAAAAAAAAAAAAAAAAAAAA\
-            AAAAAAAAAAAAAAAAAAAAAAAaAAAA1gAAAP8AAAD/AAAA/wAAAP8AAAD/AAAA/wAAAP8AAAD/AAAA/wAA\
-            AOIAAADpAAAA/wAAAP8AAAD/AAAA/wAAAP8AAAD/AAAA/wAAAP8AAAD/AAAAuQAAAA4AAAAAAAAAAAAA\
-            AAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAsAAACwAAAA/wAAAP8AAAD/AAAA/wAAAP8AAAD/AAAA/wAA\
-            AP8AAAD/AAAA6AAAAOgAAAD/AAAA/wAAAP8AAAD/AAAA/wAAAP8AAAD/AAAA/wAAAP8AAAC8AAAADwAA\
-            AAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAADAAAALIAAAD/AAAA/wAAAP8AAAD/AAAA/wAA\
-            AP8AAAD/AAAA/wAAAP8AAADpAAAA4gAAAP8AAAD/AAAA/wAAAP8AAAD/AAAA/wAAAP8AAAD/AAAA/wAA\
-            AN8AAAAiAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAcAAAA2AAAAP8AAAD/AAAA/wAA\
-            AP8AAAD/AAAA/wAAAP8AAAD/AAAA/wAAAOAAAABoAAAAqAAAANUAAAD6AAAA/wAAAP8AAAD/AAAA/wAA\
-            AP8AAAD/AAAA+gAAAHEAAAABAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAGgAAAD4AAAA/wAA\
-            AP8AAAD/AAAA/wAAAP8AAAD/AAAA+AAAAMkAAACVAAAAVQAAAAEAAAAIAAAAIAAAAIkAAAD2AAAA/wAA\
-            AP8AAAD/AAAA/wAAAP8AAAD/AAAA3wAAAEQAAAABAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAA+AAAA2gAA\
-            AP8AAAD/AAAA/wAAAP8AAAD/AAAA/wAAAPYAAACCAAAAFwAAAAMAAAAAAAAAAAAAAAAAAAAAAAAADQAA\
-            AKcAAAD/AAAA/wAAAP8AAAD/AAAA/wAAAP8AAAD/AAAA4AAAAHEAAAAhAAAADwAAAA8AAAAgAAAAbAAA\
-            ANwAAAD/AAAA/wAAAP8AAAD/AAAA/wAAAP8AAAD/AAAArgAAAA4AAAAAAAAAAAAAAAAAAAAAAAAAAAAA\
-            AAAAAAAAAAAAXQAAAPgAAAD/AAAA/wAAAP8AAAD/AAAA/wAAAP8AAAD/AAAA+AAAAOAAAAC+AAAAvAAA\
-            AN4AAAD4AAAA/wAAAP8AAAD/AAAA/wAAAP8AAAD/AAAA/wAAAP0AAABsAAAAAAAAAAAAAAAAAAAAAAAA\
-            AAAAAAAAAAAAAAAAAAAAAABTAAAA9QAAAP8AAAD/AAAA/wAAAP8AAAD/AAAA/wAAAP8AAAD/AAAA/wAA\
-            AP8AAAD/AAAA/wAAAP8AAAD/AAAA/wAAAP8AAAD/AAAA/wAAAP8AAAD/AAAA/AAAAGYAAAAAAAAAAAAA\
-            AAAAAAAAAAAAAAAAAAAAAAAAAAAAAQAAAIYAAAD/AAAA/wAAAP8AAAD/AAAA/wAAAP8AAAD/AAAA/wAA\
-            AP8AAAD/AAAA/wAAAP8AAAD/AAAA/wAAAP8AAAD/AAAA/wAAAP8AAAD/AAAA/wAAAP8AAAD/AAAAnAAA\
-            AAYAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAA/AAAA4AAAAP8AAAD/AAAA/wAAAP8AAAD/AAAA/wAA\
-            AP8AAAD/AAAA/wAAAP8AAAD/AAAA/wAAAP8AAAD/AAAA/wAAAP8AAAD/AAAA/wAAAP8AAAD/AAAA/wAA\
-            AP8AAADuAAAAVAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAIUAAAD/AAAA/wAAAP8AAAD/AAAA/wAA\
-            AP8AAAD/AAAA/wAAAP8AAAD/AAAA/wAAAP8AAAD/AAAA/wAAAP8AAAD/AAAA/wAAAP8AAAD/AAAA/wAA\
-            AP8AAAD/AAAA/wAAAP8AAACQAAAAAgAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAMgAAAMoAAAD/AAAA/wAA\
-            AP8AAAD/AAAA/gAAAP0AAAD/AAAA/wAAAP8AAAD/AAAA/wAAAP8AAAD/AAAA/wAAAP8AAAD/AAAA+QAA\
-            APcAAAD+AAAA/wAAAP8AAAD/AAAAyAAAADAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAMwAA\
-            AMgAAAD/AAAA8QAAAKcAAABvAAAAbwAAAK4AAAD1AAAA/wAAAP8AAAD/AAAA/wAAAP8AAAD/AAAA9AAA\
-            AKYAAABgAAAAWAAAAIsAAADjAAAA/wAAAMkAAAAzAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAA\
-            AAAAAAAAAAAAMAAAAJYAAABcAAAACgAAAAAAAAAAAAAADQAAAIAAAAD5AAAA/wAAAP8AAAD/AAAA/wAA\
-            APoAAACDAAAADAAAAAAAAAAAAAAAAwAAAEAAAACFAAAAMgAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAA\
-            AAAAAAAAAAAAAAAAAAAAAAAAAAAABAAAAAEAAAAAAAAAAAAAAAAAAAAAAAAAFgAAAMMAAAD/AAAA/wAA\
-            AP8AAAD/AAAAzwAAABwAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAA\
-            AAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAABAAAAkAAA\
-            AP8AAAD/AAAA/wAAAP8AAACjAAAABwAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAA\
-            AAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAA\
-            AAAAAABVAAAA4QAAAOoAAADoAAAA5AAAAGcAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAA\
-            AAAAAAAAAAAAAAAAAAAAAAAA//gf///wD///8A8/+GAGH/AAAA/gAAAHwAAAB+AAAAfgAAAH8AAAD/AA\
-            AA/gAAAHgAfgAQAP8AAAD/AAAA/wAAAP8AAAD/AAAAfwAAAD4AHgAAAH8AAAD/AAAA/gAAAH4AAAB+AA\
-            AAPgAAAH8AAAD/hgBh/88A////AP///4H/8="
-
-        icodata = base64.b64decode(icon)  # Decode base64 image
-        temfile = "icon.ico"  # Create temporary file
-        icofile = open(temfile, "wb")  # Open temporary file
-        icofile.write(icodata)  # Write icon data
-        icofile.close()
-        top.wm_iconbitmap(temfile)  # Set window icon to the icon image
-        os.remove(temfile)
-
-        self.DiLabel = Label(top, text='Dimetric Settings').place(x=50, rely=.05, anchor="c")
-        self.fzLabel = Label(top, text='Fz').place(x=45, rely=.2, anchor="c")
-        self.phiLabel = Label(top, text='Phi').place(x=45, rely=.5, anchor="c")
-        self.thetaLabel = Label(top, text='Theta').place(x=45, rely=.65, anchor="c")
-        self.TriLabel = Label(top, text='Trimetric Settings').place(x=50, rely=.35, anchor="c")
+        # Assign an icon to the settings popup box from the base64 stored PNG image (no temporary files)
+        self.icon = PhotoImage(master=top, data=SETTINGS_ICON)
+        top.iconphoto(False, self.icon)
+
+        self.DiLabel = Label(top, text='Dimetric Settings').place(x=50, rely=.04, anchor="c")
+        self.fzLabel = Label(top, text='Fz').place(x=45, rely=.16, anchor="c")
+        self.phiLabel = Label(top, text='Phi').place(x=45, rely=.40, anchor="c")
+        self.thetaLabel = Label(top, text='Theta').place(x=45, rely=.52, anchor="c")
+        self.TriLabel = Label(top, text='Trimetric Settings').place(x=50, rely=.28, anchor="c")
+        self.EdgeLabel = Label(top, text='Feature Edge Settings').place(x=62, rely=.64, anchor="c")
+        self.angleLabel = Label(top, text='Angle').place(x=45, rely=.76, anchor="c")
         self.fzBox = Entry(top)  # Fz entry box
-        self.fzBox.place(x=140, rely=.2, anchor="c")
+        self.fzBox.place(x=140, rely=.16, anchor="c")
         self.fzBox.insert(0, fz.get())  # Prefill with Fz variable value
         self.phiBox = Entry(top)  # Phi entry box
-        self.phiBox.place(x=140, rely=.5, anchor="c")
+        self.phiBox.place(x=140, rely=.40, anchor="c")
         self.phiBox.insert(0, phi.get())  # Prefill with Phi variable value
         self.thetaBox = Entry(top)  # Theta entry box
-        self.thetaBox.place(x=140, rely=.65, anchor="c")
+        self.thetaBox.place(x=140, rely=.52, anchor="c")
         self.thetaBox.insert(0, theta.get())  # Prefill with Theta variable value
+        self.angleBox = Entry(top)  # Feature edge angle threshold entry box (degrees)
+        self.angleBox.place(x=140, rely=.76, anchor="c")
+        self.angleBox.insert(0, feature_angle.get())  # Prefill with feature angle variable value
         # Save button, runs command to store/send variables back to the main window space
-        self.mySubmitButton = Button(top, text='Save', command=self.send).place(relx=.5, rely=.85, anchor="c")
+        self.mySubmitButton = Button(top, text='Save', command=self.send).place(relx=.5, rely=.9, anchor="c")
 
     def send(self):
         # Update main window variables with those filled in the entry boxes
         fz.set(self.fzBox.get())
         phi.set(self.phiBox.get())
         theta.set(self.thetaBox.get())
+        feature_angle.set(self.angleBox.get())
+        record('settings', fz=fz.get(), phi=phi.get(), theta=theta.get(), feature_angle=feature_angle.get())
+        self.top.destroy()  # Destroy popup window and return to main window loop
+
+
+# Class to create a cross section popup dialog box with the sweep direction and a slider for the plane position
+class SectionDialog:
+    def __init__(self, parent):
+        top = self.top = Toplevel(parent)  # Use Tkinter top for a separate popup GUI
+        top.geometry("240x250")  # Window dimensions
+        top.resizable(0, 0)  # Un-resizable
+        top.title('Cross Section')  # Window title
+        top.protocol('WM_DELETE_WINDOW', self.close)  # Return to the full object view when closed
+
+        # Assign an icon to the section popup box from the base64 stored PNG image (no temporary files)
+        self.icon = PhotoImage(master=top, data=SETTINGS_ICON)
+        top.iconphoto(False, self.icon)
+
+        self.axis = StringVar(master=top, value='x')  # Sweep direction
+        self.position = DoubleVar(master=top, value=50)  # Plane position in percent across the object
+        self.clipped = BooleanVar(master=top, value=True)  # Draw the object behind the plane
+
+        self.AxisLabel = Label(top, text='Sweep Direction').place(x=50, rely=.06, anchor="c")
+        for n, axis in enumerate(['X', 'Y', 'Z']):
+            Radiobutton(top, text=axis, variable=self.axis, value=axis.lower(),
+                        command=self.update).place(x=30 + 55*n, rely=.18, anchor="w")
+        Radiobutton(top, text='Normal', variable=self.axis, value='normal',
+                    command=self.update).place(x=30, rely=.30, anchor="w")
+        self.normalBox = Entry(top, width=12)  # Normal vector entry box (nx ny nz)
+        self.normalBox.place(x=150, rely=.30, anchor="c")
+        self.normalBox.insert(0, '1 1 0')
+        self.normalBox.bind('<Return>', self.update)
+        self.PositionLabel = Label(top, text='Plane Position (%)').place(x=58, rely=.44, anchor="c")
+        self.positionScale = Scale(top, from_=0, to=100, orient=HORIZONTAL, length=200, variable=self.position,
+                                   command=self.update)
+        self.positionScale.place(relx=.5, rely=.58, anchor="c")
+        self.clippedBox = Checkbutton(top, text='Show Clipped Object', variable=self.clipped, command=self.update)
+        self.clippedBox.place(x=30, rely=.74, anchor="w")
+        # Close button, returns the display to the full object
+        self.myCloseButton = Button(top, text='Close', command=self.close).place(relx=.5, rely=.9, anchor="c")
+        self.update()
+
+    def normal(self):
+        # Unit vector of the selected axis or the normal vector typed in the entry box
+        if self.axis.get() != 'normal':
+            return [float(self.axis.get() == a) for a in 'xyz']
+        return [float(v) for v in self.normalBox.get().replace(',', ' ').split()]
+
+    def update(self, *args):
+        # Re-plot the section of the open object with the current settings
+        if not hasattr(file_select, 'stlobject'):
+            return
+        try:
+            normal = self.normal()
+        except ValueError:
+            return  # Ignore the normal vector until it is fully typed in
+        if len(normal) != 3 or not any(normal):
+            return
+        record('section', normal=normal, position=self.position.get()/100, clipped=self.clipped.get())
+        DrawObject.plot_section(file_select.stlobject, screen, normal, self.position.get()/100, self.clipped.get())
+
+    def close(self):
+        global section_dialog
+        section_dialog = None  # Face picking is available again
         self.top.destroy()  # Destroy popup window and return to main window loop
+        if hasattr(file_select, 'stlobject'):
+            record('replot')
+            DrawObject.replot(file_select.stlobject, screen)
 
 
 def save_click():
         SettingsDialog(window)  # Create a new instance of the popup window class
 
 
+def section_click():
+        global section_dialog
+        if section_dialog is not None:
+                section_dialog.top.lift()  # Only a single cross section popup is open at a time
+                return
+        section_dialog = SectionDialog(window)  # Create a new instance of the cross section popup window class
+
+
 def file_select():
         # Function to select an STL file and store the path as "filename"
-        window.filename = filedialog.askopenfilename(initialdir="C:\\", title="Select STL File",
-                                                     filetypes=(("STL files", "*.STL"), ("All files", "*.*")))
+        open_file(filedialog.askopenfilename(initialdir="C:\\", title="Select STL File",
+                                             filetypes=(("STL files", "*.STL"), ("All files", "*.*"))))
+
+
+def open_file(filename):
+        window.filename = filename
         status_text = "Opened: " + window.filename  # Add file name/path to bottom status bar
         status.configure(text=status_text)
-        file_select.stlobject = DrawObject()  # Create new stlobject class for the selected file
+        init_display()
+        record('open', file=window.filename)
+        file_select.stlobject = DrawObject(window.filename)  # Create new stlobject class for the selected file
+        window.title("STL Viewer Application - " + file_select.stlobject.model.name)  # Put filename in the GUI header
+        milestone('model loaded')
         DrawObject.initial_plot(file_select.stlobject, screen)  # Run initial object plot function for the class
+        milestone('first render')
+
+
+def scene_select():
+        # Function to select a scene file of STL model instances and display all of them together
+        open_scene(filedialog.askopenfilename(initialdir="C:\\", title="Select Scene File",
+                                              filetypes=(("Scene files", "*.scene"), ("All files", "*.*"))))
+
+
+def open_scene(filename):
+        window.filename = filename
+        status_text = "Opened: " + window.filename  # Add file name/path to bottom status bar
+        status.configure(text=status_text)
+        init_display()
+        record('open', file=window.filename)
+        scene = Scene()
+        scene.load_scene(window.filename)  # Each STL file is loaded once and shared by its instances
+        window.title("STL Viewer Application - " + scene.name)  # Put scene name in the GUI header
+        file_select.stlobject = DrawObject(scene=scene)  # Create new stlobject class for the scene
+        milestone('model loaded')
+        DrawObject.initial_plot(file_select.stlobject, screen)  # Run initial object plot function for the class
+        milestone('first render')
 
 
 def about_popup():
@@ -285,224 +418,317 @@ def about_popup():
                             'Created by Evan Chodora, 2018\n\n Designed to open and view ASCII STL files')
 
 
-# ****** Initialize Main Window ******	
-
-window = Tk()
-window.title('STL Viewer Application')  # Main window title
-
-# Code to embed base64 version of the window icon into the title bar
-cube = \
-        "AAABAAEAICAAAAEAIACoEAAAFgAAACgAAAAgAAAAQAAAAAEAIAAAAAAAABAAANcNAADXDQAAAAAAAAAAAAAAAAAAAAAAAAAAAAAA\
-        AAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAADwAAAFgAAADEAAAAxAAAAFgAAAAPAAAAAAAAAAAAAAAA\
-        AAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAA\
-        AAAAAAAAAAAAAAAADQAAAE4AAACwAAAA8gAAAP0AAAD+AAAA8AAAAK8AAABOAAAADQAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAA\
-        AAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAADQAAAE8AAACxAAAA9AAAAP0A\
-        AADSAAAAjAAAAOwAAAD/AAAA/wAAAPIAAACxAAAATwAAAA0AAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAA\
-        AAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAADQAAAE8AAACxAAAA9AAAAP0AAADTAAAAdgAAAB8AAAAdAAAA4wAAAP8AAAD/AAAA\
-        /wAAAP8AAADyAAAAsQAAAE8AAAANAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAADQAA\
-        AE8AAACxAAAA9AAAAP0AAADTAAAAdgAAACEAAAABAAAAAAAAABwAAADjAAAA/wAAAP8AAAD/AAAA/wAAAP8AAAD/AAAA8gAAALEA\
-        AABPAAAADQAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAADQAAAE8AAACxAAAA9AAAAP0AAADTAAAAdgAAACEAAAAB\
-        AAAAAAAAAAAAAAAAAAAAHAAAAOMAAAD/AAAA/wAAAP8AAAD/AAAA/wAAAP8AAAD/AAAA/wAAAPIAAACxAAAATwAAAA0AAAAAAAAA\
-        AAAAAAAAAAAAAAAADQAAAE8AAACxAAAA9AAAAP0AAADTAAAAdgAAACEAAAABAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAcAAAA4wAA\
-        AP8AAAD/AAAA/wAAAP8AAAD/AAAA/wAAAP8AAAD/AAAA/wAAAP8AAADyAAAAsQAAAE8AAAANAAAAAAAAAFYAAACwAAAA9AAAAP0A\
-        AADTAAAAdgAAACEAAAABAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAABwAAADjAAAA/wAAAP8AAAD/AAAA/wAAAP8AAAD/\
-        AAAA/wAAAP8AAAD/AAAA/wAAAP8AAAD/AAAA8gAAALAAAABWAAAA9QAAAP4AAADUAAAAdgAAACEAAAABAAAAAAAAAAAAAAAAAAAA\
-        AAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAHAAAAOMAAAD/AAAA/wAAAP8AAAD/AAAA/wAAAP8AAAD/AAAA/wAAAP8AAAD/AAAA/wAA\
-        AP8AAAD/AAAA/wAAAPUAAAD/AAAA6QAAADQAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAA\
-        AAAcAAAA4wAAAP8AAAD/AAAA/wAAAP8AAAD/AAAA/wAAAP8AAAD/AAAA/wAAAP8AAAD/AAAA/wAAAP8AAAD/AAAA/wAAAP8AAADj\
-        AAAAHAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAABwAAADjAAAA/wAAAP8AAAD/AAAA\
-        /wAAAP8AAAD/AAAA/wAAAP8AAAD/AAAA/wAAAP8AAAD/AAAA/wAAAP8AAAD/AAAA/wAAAOMAAAAcAAAAAAAAAAAAAAAAAAAAAAAA\
-        AAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAHAAAAOMAAAD/AAAA/wAAAP8AAAD/AAAA/wAAAP8AAAD/AAAA/wAAAP8A\
-        AAD/AAAA/wAAAP8AAAD/AAAA/wAAAP8AAAD/AAAA4wAAABwAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAA\
-        AAAAAAAAAAAAAAAcAAAA4wAAAP8AAAD/AAAA/wAAAP8AAAD/AAAA/wAAAP8AAAD/AAAA/wAAAP8AAAD/AAAA/wAAAP8AAAD/AAAA\
-        /wAAAP8AAADjAAAAHAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAABwAAADjAAAA/wAA\
-        AP8AAAD/AAAA/wAAAP8AAAD/AAAA/wAAAP8AAAD/AAAA/wAAAP8AAAD/AAAA/wAAAP8AAAD/AAAA/wAAAOMAAAAcAAAAAAAAAAAA\
-        AAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAHAAAAOMAAAD/AAAA/wAAAP8AAAD/AAAA/wAAAP8AAAD/\
-        AAAA/wAAAP8AAAD/AAAA/wAAAP8AAAD/AAAA/wAAAP8AAAD/AAAA4wAAABwAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAA\
-        AAAAAAAAAAAAAAAAAAAAAAAAAAAcAAAA4wAAAP8AAAD/AAAA/wAAAP8AAAD/AAAA/wAAAP8AAAD/AAAA/wAAAP8AAAD/AAAA/wAA\
-        AP8AAAD/AAAA/wAAAP8AAADjAAAAHAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAABwA\
-        AADjAAAA/wAAAP8AAAD/AAAA/wAAAP8AAAD/AAAA/wAAAP8AAAD/AAAA/wAAAP8AAAD/AAAA/wAAAP8AAAD/AAAA/wAAAOMAAAAc\
-        AAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAHAAAAOMAAAD/AAAA/wAAAP8AAAD/AAAA\
-        /wAAAP8AAAD/AAAA/wAAAP8AAAD/AAAA/wAAAP8AAAD/AAAA/wAAAP8AAAD/AAAA4wAAABwAAAAAAAAAAAAAAAAAAAAAAAAAAAAA\
-        AAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAcAAAA4wAAAP8AAAD/AAAA/wAAAP8AAAD/AAAA/wAAAP8AAAD/AAAA/wAAAP8A\
-        AAD/AAAA/wAAAP8AAAD/AAAA/wAAAP8AAADjAAAAHAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAA\
-        AAAAAAAAABwAAADjAAAA/wAAAP8AAAD/AAAA/wAAAP8AAAD/AAAA/wAAAP8AAAD/AAAA/wAAAP8AAAD/AAAA/wAAAP8AAAD/AAAA\
-        /wAAAOMAAAAcAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAMAAAAWAAAAWQAAAO4AAAD/AAAA/wAA\
-        AP8AAAD/AAAA/wAAAP8AAAD/AAAA/wAAAP8AAAD/AAAA/wAAAP8AAAD/AAAA/wAAAP8AAAD/AAAA4wAAABwAAAAAAAAAAAAAAAAA\
-        AAAAAAAAAAAAAAAAAAAAAAAAAgAAABMAAABEAAAAiQAAAM0AAAD1AAAA/wAAAP8AAAD/AAAA/wAAAP8AAAD/AAAA/wAAAP8AAAD/\
-        AAAA/wAAAP8AAAD/AAAA/wAAAP8AAAD/AAAA/wAAAP8AAADjAAAAHAAAAAAAAAAAAAAAAAAAAAAAAAABAAAAEQAAAD8AAACDAAAA\
-        xwAAAPIAAAD/AAAA9QAAAM4AAACQAAAAlAAAANYAAAD5AAAA/wAAAP8AAAD/AAAA/wAAAP8AAAD/AAAA/wAAAP8AAAD/AAAA/wAA\
-        AP8AAAD/AAAA/wAAAOMAAAAcAAAAAAAAAAEAAAAPAAAAOQAAAH0AAADCAAAA8AAAAP4AAAD1AAAAzwAAAI4AAABLAAAAGAAAAAMA\
-        AAAEAAAAHwAAAF4AAACqAAAA5QAAAPwAAAD/AAAA/wAAAP8AAAD/AAAA/wAAAP8AAAD/AAAA/wAAAP8AAAD/AAAA5AAAACgAAAAy\
-        AAAAdgAAALsAAADuAAAA/gAAAPUAAADPAAAAjgAAAEsAAAAYAAAAAwAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAkAAAAwAAAA\
-        dgAAAMAAAADvAAAA/gAAAP8AAAD/AAAA/wAAAP8AAAD/AAAA/wAAAP8AAAD0AAAAwQAAAOgAAAD9AAAA9AAAAM4AAACNAAAASgAA\
-        ABcAAAADAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAABAAAAEQAAAEQAAACOAAAA0wAAAPYA\
-        AAD/AAAA/wAAAP8AAAD/AAAA/wAAAP8AAAD/AAAA+QAAALEAAABVAAAAFQAAAAEAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAA\
-        AAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAEAAAAgAAAAbwAAANQAAAD/AAAA/wAAAP8AAADtAAAA\
-        +wAAAP8AAAD+AAAA4wAAALAAAAB8AAAASQAAAB4AAAAJAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAA\
-        AAAAAAAAAAAABQAAABQAAAA2AAAAZwAAAJgAAADJAAAA8wAAAP8AAAD7AAAA7QAAADgAAABmAAAAmQAAAMoAAADtAAAA/AAAAP8A\
-        AAD1AAAA2wAAAKkAAAB0AAAAQAAAABgAAAAGAAAAAAAAAAAAAAAAAAAAAAAAAAQAAAAUAAAANQAAAGYAAACZAAAAzAAAAO4AAAD9\
-        AAAA/AAAAO4AAADLAAAAmQAAAGYAAAA4AAAAAAAAAAAAAAAEAAAAFAAAADUAAABmAAAAmQAAAMsAAADtAAAA/AAAAP4AAADyAAAA\
-        0wAAAJ8AAABqAAAANwAAADYAAABmAAAAmQAAAMwAAADuAAAA/QAAAPwAAADuAAAAzAAAAJkAAABmAAAANQAAABQAAAAEAAAAAAAA\
-        AAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAEAAAAFAAAADUAAABmAAAAmAAAAMoAAADsAAAA+wAAAPwAAADtAAAA7QAAAPwA\
-        AAD8AAAA7AAAAMoAAACYAAAAZgAAADUAAAAUAAAABAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAA\
-        AAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAFAAAAFwAAADwAAABzAAAArAAAAOMAAADjAAAArAAAAHMAAAA8AAAAFwAAAAUAAAAAAAAA\
-        AAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAA//gf///gB///gAH//gAAf/gCAB/gDgAHgD4AAQD+AAAD/gAAH/4AAB/+\
-        AAAf/gAAH/4AAB/+AAAf/gAAH/4AAB/+AAAf/gAAH/4AAB/+AAAf+AAAH8AAAB4AAAAQAAAAAAPwAAAf/AAA//+AAD/8AAADwADA\
-        AAAD/AAAP//AA/8="
-
-icondata = base64.b64decode(cube)  # Decode base64 image
-tempfile = "icon.ico"  # Create temporary file
-iconfile = open(tempfile, "wb")  # Open temporary file
-iconfile.write(icondata)  # Write icon data
-iconfile.close()
-window.wm_iconbitmap(tempfile)  # Set window icon to the icon image
-os.remove(tempfile)
-
-window.geometry("1200x800")  # Main overall window size
-window.resizable(0, 0)  # Scaling disallowed in X and Y
-
-# ****** Embed PyGame Window (Pixel Map Display) ******
+def plot(transtype, data):
+        # Re-plot the open object with a transformation from the toolbar, control panel or keyboard
+        record('plot', transtype=transtype, data=data)
+        DrawObject.plot_transform(file_select.stlobject, screen, transtype, data)
+
+
+def hover_face(event):
+        # Highlight the face under the mouse on the display (not on the cut away object of a cross section)
+        if not hasattr(file_select, 'stlobject') or section_dialog is not None:
+                return
+        stlobject = file_select.stlobject
+        face = stlobject.pick(event.x, event.y) if event.type == EventType.Motion else -1
+        if face != stlobject.hover:
+                stlobject.hover = face
+                stlobject.plot_highlight(screen, face)
+
+
+def click_face(event):
+        # Show the index, normal and vertices of the clicked face in the status bar
+        if not hasattr(file_select, 'stlobject') or section_dialog is not None:
+                return
+        face = file_select.stlobject.pick(event.x, event.y)
+        if face >= 0:
+                status.configure(text=file_select.stlobject.model.face_info(face))
+
+
+def recenter():
+        # Re-plot the open object without any transformations
+        record('recenter')
+        DrawObject.initial_plot(file_select.stlobject, screen)
+
+
+def record(kind, **data):
+        # Add an event to the session being recorded (if any)
+        if recorder is not None:
+                recorder.record(kind, **data)
+
+
+def start_recording():
+        # Start recording a new session with the current settings (and the open object redrawn from its start)
+        global recorder
+        load_modules()
+        recorder = SessionRecorder()
+        record('settings', persp=persp.get(), view=view.get(), fz=fz.get(), phi=phi.get(), theta=theta.get(),
+               feature_angle=feature_angle.get())
+        if hasattr(file_select, 'stlobject'):
+                record('open', file=window.filename)
+                recenter()
+        status.configure(text="Recording session...")
+
+
+def stop_recording():
+        # Stop recording and save the session events to a file for replay with session.py
+        global recorder
+        if recorder is None:
+                return
+        events, recorder = recorder, None
+        filename = filedialog.asksaveasfilename(title="Save Session", defaultextension=".session",
+                                                filetypes=(("Session files", "*.session"), ("All files", "*.*")))
+        if filename:
+                events.save(filename)
+                status.configure(text="Saved session of %d events: %s" % (len(events.events), filename))
+
+
+def milestone(name):
+        # Record the first time a startup milestone is reached (printed when started with --timing)
+        if name not in startup_times:
+                startup_times[name] = time.perf_counter() - START
+                if show_timing:
+                        print('%-20s %8.1f ms' % (name, 1000*startup_times[name]), file=sys.stderr)
+
+
+def load_modules():
+        # Import NumPy, PyGame and the geometry modules as globals of this module (deferred until first needed)
+        global np, pygame, gtransform, draw_lines, draw_edges, rasterize, EdgeSet, orient_matrix, read_stl, Scene
+        global FaceBVH, face_pixels, SweepIndex, contour, SessionRecorder
+        import numpy as np
+        import pygame
+        import gtransform
+        from drawlines import draw_lines, draw_edges, rasterize
+        from edges import EdgeSet
+        from orient import orient_matrix
+        from stlfile import read_stl
+        from scene import Scene
+        from bvh import FaceBVH, face_pixels
+        from section import SweepIndex, contour
+        from session import SessionRecorder
+        milestone('modules imported')
+
+
+def init_display():
+        # Create the embedded PyGame pixel display the first time it is needed (the modules are imported here)
+        global screen
+        if screen is not None:
+                return screen
+        # Set appropriate environment variables for embedding the PyGame pixel display window in the GUI
+        os.environ['SDL_WINDOWID'] = str(embed.winfo_id())
+        os.environ['SDL_VIDEODRIVER'] = 'windib'
+        load_modules()
+        screen = pygame.display.set_mode((embed_w, embed_h))  # Create screen with specified width and height
+        # Set embed screen to white and refresh the screen object
+        screen.fill((255, 255, 255))
+        pygame.display.init()
+        pygame.display.flip()
+        milestone('display initialized')
+        return screen
+
+
+# Base64 PNG images of the main window (cube) and perspective settings popup icons
+WINDOW_ICON = (
+        "iVBORw0KGgoAAAANSUhEUgAAACAAAAAgCAYAAABzenr0AAACLklEQVR42u3Xu2tUQRjG4WeTGFByQ1EslHhBBIVoTKG2oiIKphJiY2VvZ2dnI4"
+        "h/g7WN2tmIoIJIjIIX8C5itDAqMSYRNTE278KyyWb3RIxNPviY5cyceX/zzsyZ2ZLGYxlWYgt2Y29KuIs7KV/gC3410mlpnroWdGEjerEruQmd"
+        "efdr2namHMVr3E8+wJs8n6oHUC3YVyXYhHG8xT0MYggz2Jn2fRXtZzAWoKHkLKAS9qAnL/diczpoxiQ+ZDSDEX4ai3/WcawW0Kv0N4SHJXxGRz"
+        "qYwftU3kv5BCP4rlgsi/CmAJVzG9riwJiIlvMHruIYVtdZI0WihA04hceVmqX8mMhot0b4O57jBq6n7hOmC4p2ZRoO40Cmd3l1o7Lt+7Ei5YG8"
+        "2FUDZmQemOUZyMEI76jYNXPGDN5hXQVUZ/b5GdzMqv0dpx7gAo5gbRZrC7pxApcyoKmq6Z0zyw4MR3C4ho09cWY/tqM9O+RZAFuwLxa3Fl0g1Q"
+        "7UiiasCsS5TMVEI6Oskw0DVEYz1uB4vgkLBmha4LaaxkfcigsLjib/OZYAlgCWAJYAygCtOdn+C8BkLiEXcTp3utIi6U8242Uc2IVDOe3achn9"
+        "WqeDDpxMWSS+4RrOlh+0oz/3wfEcNo8acGRdTtJGT7+xaPRHc1YUBWkUoK7wQkHqARQWLgLSjfU1AP5auBGQhzif6/o/E54L5CiuRGw6t+VRXE"
+        "5d+2Ls304M4HZyoOIfcqH4A4QJ7vyN1ZMPAAAAAElFTkSuQmCC")
+SETTINGS_ICON = (
+        "iVBORw0KGgoAAAANSUhEUgAAACAAAAAgCAYAAABzenr0AAACwklEQVR42r3Xz2tVRxQH8E+eVk3wByJajNpqKILQRTCiIGJASvsHqFCo4KpURB"
+        "D3LlrRQndu1IXuFHWjBRHRgKu2YBRbQS221CYVUYmoQUhinsbXzRFeL3fuve9h+oXZzJ05c+bMOd/zvbSH7fgHI3iCh/jG/4QOHEYjM05idqvG"
+        "agXfZsZhWSxGX878p/GtJcxIzPdiPxbiL7yO+XnYiy9z9i7CK9xAvcl+P77GKB7nhTOLPhzBBrzEJVyLb/34Al0Jx8dwAQPhTF84uxzXsRs3iy"
+        "KyNhZm3/ctpnLmU2MSE7Gvef5aRDeJQy0c0u443Jx72SQciPKaLrzAzxGZZIl9P423P4FZRWXYiCQZn4bbT0V+1bO1nkVXQXm+w2Qw4N8Rzh50"
+        "lxBRR/b2eZiHMyVhHMY+rMKCGCuxJzijaO95zM/zbE4Y+SHCnzIwhM8S/AGb8WfB/nEcwIfNUd6Fs7gb75PaXI+bd5REcVeQUMrOKwwG2W2HBx"
+        "UzeCjeugzLca+izeFalcQI3MezCutG4xmqoLNWIaTNZdSosK5RRDTZtbXg7Cr4JLpjGRZgdUWb9RmhZp6G14sT3PCOH4ai3RZhK77CB6lDcQdX"
+        "caqZEZfgu5Iy/AMbCw5fF8ZT+8dwEMtSuTcf50oy914IjO6ISheWYmfJ4Q2cxtyyd9lTofeP43f8GA7fjts1Sup/R57uy3ujsmzvxJoYrTSjiT"
+        "JROgvrKzSjdtAVEq2w7Lfh+TTqgeHQlbkRqGFTxVpvFx/j86IFvSEcs4J0IjRA1ZtOJRL5egjf5H/BE/wWjiwLkjqOY7gcmdxTQDLjuBh7rkRf"
+        "+CiEymDI8l+rhGptaMMtGSfnBpG8Tkjxb0PUNCfeDhwtk+OtYAVu5TjwU7BpnuCZ2c6/YQojQTxZ3Iyektcd37xPByZD248EadXxCL9UbNf/wb"
+        "84v2of9bpTjQAAAABJRU5ErkJggg==")
 
 embed_w = 900  # Width of object display screen
 embed_h = 700  # Height of object display screen
-embed = Frame(window, width=embed_w, height=embed_h)  # Embed in the GUI window
-embed.place(x=50, y=40)  # Location of placement
-# Set appropriate environment variables for embedding the PyGame pixel display window in the GUI
-os.environ['SDL_WINDOWID'] = str(embed.winfo_id())
-os.environ['SDL_VIDEODRIVER'] = 'windib'
-screen = pygame.display.set_mode((embed_w, embed_h))  # Create screen with specified width and height
-# Set embed screen to white and refresh the screen object
-screen.fill((255, 255, 255))
-pygame.display.init()
-pygame.display.flip()
-
-# ****** Define Default Perspective Settings and View Type ******
-
-persp = StringVar()
-persp.set('iso')
-view = StringVar()
-view.set('hide')
-phi = DoubleVar()
-phi.set(45)
-theta = DoubleVar()
-theta.set(35)
-fz = DoubleVar()
-fz.set(0.375)
+screen = None  # PyGame display, created when the first model is opened
+startup_times = {}  # Seconds since START at which each startup milestone was reached
+show_timing = False
+recorder = None  # Session recorder while a session is being recorded
+section_dialog = None  # Open cross section popup (face picking is off while it is open)
+
 
 # ****** Toolbar ******
 
-# Create main menu bar
-menu = Menu(window, tearoff=False)
-window.config(menu=menu)
-
-# Create "File" submenu
-subMenu = Menu(menu, tearoff=False)
-menu.add_cascade(label="File", menu=subMenu)
-subMenu.add_command(label="Open File", command=file_select)
-subMenu.add_command(label="Exit", command=window.destroy)
-
-# Create "Edit View" submenu
-subMenu = Menu(menu, tearoff=False)
-menu.add_cascade(label="Edit View", menu=subMenu)
-perspMenu = Menu(subMenu, tearoff=False)
-subMenu.add_cascade(label="Change Perspective", menu=perspMenu)
-perspMenu.add_radiobutton(label='Isometric', variable=persp, value='iso')  # Isometric projection
-perspMenu.add_radiobutton(label='Dimetric', variable=persp, value='di')  # Dimetric projection
-perspMenu.add_radiobutton(label='Trimetric', variable=persp, value='tri')  # Trimetric projection
-viewMenu = Menu(subMenu, tearoff=False)
-subMenu.add_cascade(label="View Type", menu=viewMenu)
-viewMenu.add_radiobutton(label='Wireframe', variable=view, value='wire')  # Full wireframe
-viewMenu.add_radiobutton(label='Hide Faces', variable=view, value='hide')  # Hide non-visible faces
-viewMenu.add_radiobutton(label='Partial Hidden', variable=view, value='grey')  # Grey hidden lines
-subMenu.add_command(label="Recenter Object", command=lambda: DrawObject.initial_plot(file_select.stlobject, screen))
-subMenu.add_command(label="Perspective Settings", command=save_click)
-
-# Create "Orthographic" submenu
-subMenu = Menu(menu, tearoff=False)
-menu.add_cascade(label="Orthographic", menu=subMenu)
-subMenu.add_command(label="Top", command=lambda: DrawObject.plot_transform(file_select.stlobject, screen,
-                                                                           'ortho', 'top'))
-subMenu.add_command(label="Bottom", command=lambda: DrawObject.plot_transform(file_select.stlobject, screen,
-                                                                              'ortho', 'bottom'))
-subMenu.add_command(label="Left", command=lambda: DrawObject.plot_transform(file_select.stlobject, screen,
-                                                                            'ortho', 'left'))
-subMenu.add_command(label="Right", command=lambda: DrawObject.plot_transform(file_select.stlobject, screen,
-                                                                             'ortho', 'right'))
-subMenu.add_command(label="Front", command=lambda: DrawObject.plot_transform(file_select.stlobject, screen,
-                                                                             'ortho', 'front'))
-subMenu.add_command(label="Back", command=lambda: DrawObject.plot_transform(file_select.stlobject, screen,
-                                                                            'ortho', 'back'))
-
-# Create "Help" submenu
-subMenu = Menu(menu, tearoff=False)
-menu.add_cascade(label="Help", menu=subMenu)
-subMenu.add_command(label="About", command=about_popup)
+def build_menus():
+        # Create main menu bar
+        menu = Menu(window, tearoff=False)
+        window.config(menu=menu)
+
+        # Create "File" submenu
+        subMenu = Menu(menu, tearoff=False)
+        menu.add_cascade(label="File", menu=subMenu)
+        subMenu.add_command(label="Open File", command=file_select)
+        subMenu.add_command(label="Open Scene", command=scene_select)
+        subMenu.add_command(label="Start Recording", command=start_recording)
+        subMenu.add_command(label="Stop Recording", command=stop_recording)
+        subMenu.add_command(label="Exit", command=window.destroy)
+
+        # Create "Edit View" submenu
+        subMenu = Menu(menu, tearoff=False)
+        menu.add_cascade(label="Edit View", menu=subMenu)
+        perspMenu = Menu(subMenu, tearoff=False)
+        subMenu.add_cascade(label="Change Perspective", menu=perspMenu)
+        perspMenu.add_radiobutton(label='Isometric', variable=persp, value='iso')  # Isometric projection
+        perspMenu.add_radiobutton(label='Dimetric', variable=persp, value='di')  # Dimetric projection
+        perspMenu.add_radiobutton(label='Trimetric', variable=persp, value='tri')  # Trimetric projection
+        viewMenu = Menu(subMenu, tearoff=False)
+        subMenu.add_cascade(label="View Type", menu=viewMenu)
+        viewMenu.add_radiobutton(label='Wireframe', variable=view, value='wire')  # Full wireframe
+        viewMenu.add_radiobutton(label='Hide Faces', variable=view, value='hide')  # Hide non-visible faces
+        viewMenu.add_radiobutton(label='Partial Hidden', variable=view, value='grey')  # Grey hidden lines
+        viewMenu.add_radiobutton(label='Feature Edges', variable=view, value='edge')  # Feature and silhouette edges
+        subMenu.add_command(label="Recenter Object", command=recenter)
+        subMenu.add_command(label="Perspective Settings", command=save_click)
+        subMenu.add_command(label="Cross Section", command=section_click)
+
+        # Create "Orthographic" submenu
+        subMenu = Menu(menu, tearoff=False)
+        menu.add_cascade(label="Orthographic", menu=subMenu)
+        subMenu.add_command(label="Top", command=lambda: plot('ortho', 'top'))
+        subMenu.add_command(label="Bottom", command=lambda: plot('ortho', 'bottom'))
+        subMenu.add_command(label="Left", command=lambda: plot('ortho', 'left'))
+        subMenu.add_command(label="Right", command=lambda: plot('ortho', 'right'))
+        subMenu.add_command(label="Front", command=lambda: plot('ortho', 'front'))
+        subMenu.add_command(label="Back", command=lambda: plot('ortho', 'back'))
+
+        # Create "Help" submenu
+        subMenu = Menu(menu, tearoff=False)
+        menu.add_cascade(label="Help", menu=subMenu)
+        subMenu.add_command(label="About", command=about_popup)
+
 
 # ****** Control Panel ******
 
-# Control text labels
-rotate = Label(window, text="Rotate", font=("Helvetica", 16))
-rotate.place(x=1075, rely=0.15, anchor="c")
-zoom = Label(window, text="Zoom", font=("Helvetica", 16))
-zoom.place(x=1075, rely=0.45, anchor="c")
-pan = Label(window, text="Pan", font=("Helvetica", 16))
-pan.place(x=1075, rely=0.65, anchor="c")
-
-# Rotation buttons layout
-rot_l = Button(window, text="<-", width=5, command=lambda: DrawObject.plot_transform(file_select.stlobject, screen,
-                                                                                     'rotation', [2, -15]))
-rot_l.place(x=1025, rely=.25, anchor="c")
-rot_r = Button(window, text="->", width=5, command=lambda: DrawObject.plot_transform(file_select.stlobject, screen,
-                                                                                     'rotation', [2, 15]))
-rot_r.place(x=1125, rely=.25, anchor="c")
-rot_u = Button(window, text="/\\", width=5, command=lambda: DrawObject.plot_transform(file_select.stlobject, screen,
-                                                                                      'rotation', [1, -15]))
-rot_u.place(x=1075, rely=.2, anchor="c")
-rot_d = Button(window, text="\\/", width=5, command=lambda: DrawObject.plot_transform(file_select.stlobject, screen,
-                                                                                      'rotation', [1, 15]))
-rot_d.place(x=1075, rely=.3, anchor="c")
-
-# Zoom buttons layout
-zoom_in = Button(window, text="+", width=5, command=lambda: DrawObject.plot_transform(file_select.stlobject, screen,
-                                                                                      'zoom', [0.8]))
-zoom_in.place(x=1025, rely=.5, anchor="c")
-zoom_out = Button(window, text="-", width=5, command=lambda: DrawObject.plot_transform(file_select.stlobject, screen,
-                                                                                       'zoom', [1.25]))
-zoom_out.place(x=1125, rely=.5, anchor="c")
-
-# Panning buttons layout
-pan_l = Button(window, text="<-", width=5, command=lambda: DrawObject.plot_transform(file_select.stlobject, screen,
-                                                                                     'translate', [-20, 0, 0]))
-pan_l.place(x=1025, rely=.75, anchor="c")
-pan_r = Button(window, text="->", width=5, command=lambda: DrawObject.plot_transform(file_select.stlobject, screen,
-                                                                                     'translate', [20, 0, 0]))
-pan_r.place(x=1125, rely=.75, anchor="c")
-pan_u = Button(window, text="/\\", width=5, command=lambda: DrawObject.plot_transform(file_select.stlobject, screen,
-                                                                                      'translate', [0, -20, 0]))
-pan_u.place(x=1075, rely=.7, anchor="c")
-pan_d = Button(window, text="\\/", width=5, command=lambda: DrawObject.plot_transform(file_select.stlobject, screen,
-                                                                                      'translate', [0, 20, 0]))
-pan_d.place(x=1075, rely=.8, anchor="c")
-
-# ****** Keyboard Control Bindings ******
-
-window.bind("<Left>", lambda event: DrawObject.plot_transform(file_select.stlobject, screen, 'rotation', [2, -15]))
-window.bind("<Right>", lambda event: DrawObject.plot_transform(file_select.stlobject, screen, 'rotation', [2, 15]))
-window.bind("<Up>", lambda event: DrawObject.plot_transform(file_select.stlobject, screen, 'rotation', [1, -15]))
-window.bind("<Down>", lambda event: DrawObject.plot_transform(file_select.stlobject, screen, 'rotation', [1, 15]))
-window.bind("<a>", lambda event: DrawObject.plot_transform(file_select.stlobject, screen, 'translate', [-20, 0, 0]))
-window.bind("<d>", lambda event: DrawObject.plot_transform(file_select.stlobject, screen, 'translate', [20, 0, 0]))
-window.bind("<w>", lambda event: DrawObject.plot_transform(file_select.stlobject, screen, 'translate', [0, -20, 0]))
-window.bind("<s>", lambda event: DrawObject.plot_transform(file_select.stlobject, screen, 'translate', [0, 20, 0]))
-window.bind("<k>", lambda event: DrawObject.plot_transform(file_select.stlobject, screen, 'zoom', [0.8]))
-window.bind("<l>", lambda event: DrawObject.plot_transform(file_select.stlobject, screen, 'zoom', [1.25]))
-
-# ****** Status Bar ******
-
-status = Label(window, text="Waiting...", bd=1, relief=SUNKEN, anchor=W)
-status.pack(side=BOTTOM, fill=X)
-
-# ****** Run Main GUI Loop ******
-
-window.mainloop()  # Main loop to run the GUI, waits for button input
+def build_controls():
+        # Control text labels
+        rotate = Label(window, text="Rotate", font=("Helvetica", 16))
+        rotate.place(x=1075, rely=0.15, anchor="c")
+        zoom = Label(window, text="Zoom", font=("Helvetica", 16))
+        zoom.place(x=1075, rely=0.45, anchor="c")
+        pan = Label(window, text="Pan", font=("Helvetica", 16))
+        pan.place(x=1075, rely=0.65, anchor="c")
+
+        # Rotation buttons layout
+        rot_l = Button(window, text="<-", width=5, command=lambda: plot('rotation', [2, -15]))
+        rot_l.place(x=1025, rely=.25, anchor="c")
+        rot_r = Button(window, text="->", width=5, command=lambda: plot('rotation', [2, 15]))
+        rot_r.place(x=1125, rely=.25, anchor="c")
+        rot_u = Button(window, text="/\\", width=5, command=lambda: plot('rotation', [1, -15]))
+        rot_u.place(x=1075, rely=.2, anchor="c")
+        rot_d = Button(window, text="\\/", width=5, command=lambda: plot('rotation', [1, 15]))
+        rot_d.place(x=1075, rely=.3, anchor="c")
+
+        # Zoom buttons layout
+        zoom_in = Button(window, text="+", width=5, command=lambda: plot('zoom', [0.8]))
+        zoom_in.place(x=1025, rely=.5, anchor="c")
+        zoom_out = Button(window, text="-", width=5, command=lambda: plot('zoom', [1.25]))
+        zoom_out.place(x=1125, rely=.5, anchor="c")
+
+        # Panning buttons layout
+        pan_l = Button(window, text="<-", width=5, command=lambda: plot('translate', [-20, 0, 0]))
+        pan_l.place(x=1025, rely=.75, anchor="c")
+        pan_r = Button(window, text="->", width=5, command=lambda: plot('translate', [20, 0, 0]))
+        pan_r.place(x=1125, rely=.75, anchor="c")
+        pan_u = Button(window, text="/\\", width=5, command=lambda: plot('translate', [0, -20, 0]))
+        pan_u.place(x=1075, rely=.7, anchor="c")
+        pan_d = Button(window, text="\\/", width=5, command=lambda: plot('translate', [0, 20, 0]))
+        pan_d.place(x=1075, rely=.8, anchor="c")
+
+        # ****** Keyboard Control Bindings ******
+
+        window.bind("<Left>", lambda event: plot('rotation', [2, -15]))
+        window.bind("<Right>", lambda event: plot('rotation', [2, 15]))
+        window.bind("<Up>", lambda event: plot('rotation', [1, -15]))
+        window.bind("<Down>", lambda event: plot('rotation', [1, 15]))
+        window.bind("<a>", lambda event: plot('translate', [-20, 0, 0]))
+        window.bind("<d>", lambda event: plot('translate', [20, 0, 0]))
+        window.bind("<w>", lambda event: plot('translate', [0, -20, 0]))
+        window.bind("<s>", lambda event: plot('translate', [0, 20, 0]))
+        window.bind("<k>", lambda event: plot('zoom', [0.8]))
+        window.bind("<l>", lambda event: plot('zoom', [1.25]))
+
+        # ****** Face Picking Bindings ******
+
+        embed.bind("<Motion>", hover_face)
+        embed.bind("<Leave>", hover_face)  # Clear the highlight when the mouse leaves the display
+        embed.bind("<Button-1>", click_face)
+
+
+def main():
+        global window, embed, status, persp, view, phi, theta, fz, feature_angle, show_timing
+
+        parser = argparse.ArgumentParser(description='STL Viewer Application')
+        parser.add_argument('file', nargs='?', help='STL or scene file to open at startup')
+        parser.add_argument('--timing', action='store_true', help='print startup time milestones')
+        args = parser.parse_args()
+        show_timing = args.timing
+        milestone('imports')
+
+        # ****** Initialize Main Window ******
+
+        window = Tk()
+        window.title('STL Viewer Application')  # Main window title
+        icon = PhotoImage(master=window, data=WINDOW_ICON)  # Decode window icon from the base64 PNG image
+        window.iconphoto(True, icon)  # Set window icon to the icon image
+        window.geometry("1200x800")  # Main overall window size
+        window.resizable(0, 0)  # Scaling disallowed in X and Y
+
+        # ****** Embed PyGame Window (Pixel Map Display) ******
+
+        embed = Frame(window, width=embed_w, height=embed_h)  # Embed in the GUI window
+        embed.place(x=50, y=40)  # Location of placement
+
+        # ****** Define Default Perspective Settings and View Type ******
+
+        persp = StringVar()
+        persp.set('iso')
+        view = StringVar()
+        view.set('hide')
+        phi = DoubleVar()
+        phi.set(45)
+        theta = DoubleVar()
+        theta.set(35)
+        fz = DoubleVar()
+        fz.set(0.375)
+        feature_angle = DoubleVar()
+        feature_angle.set(30)
+        # Record perspective and view type changes from the menus in a session being recorded
+        persp.trace_add('write', lambda *args: record('settings', persp=persp.get()))
+        view.trace_add('write', lambda *args: record('settings', view=view.get()))
+
+        # ****** Status Bar ******
+
+        status = Label(window, text="Waiting...", bd=1, relief=SUNKEN, anchor=W)
+        status.pack(side=BOTTOM, fill=X)
+
+        # Show the window before building the menus and controls
+        window.update()
+        milestone('window shown')
+        build_menus()
+        build_controls()
+        milestone('controls ready')
+
+        # Start loading and drawing a model given on the command line right away
+        if args.file:
+                if args.file.lower().endswith('.scene'):
+                        open_scene(args.file)
+                else:
+                        open_file(args.file)
+
+        # ****** Run Main GUI Loop ******
+
+        window.mainloop()  # Main loop to run the GUI, waits for button input
+
+
+if __name__ == '__main__':
+        main()
@@ -0,0 +1,118 @@
+import numpy as np
+
+'''
+Bounding volume hierarchy over the faces of an STL object for picking the face under the mouse
+ - Built once per object: faces are sorted along a Morton (Z-order) curve of their centroids and grouped into leaves
+   of a few faces, with a complete binary tree of leaves stored in flat arrays (node i has children 2i and 2i+1)
+ - Object transformations keep neighboring faces together, so after a transformation the tree is only refit
+   (bounds recomputed from the leaves up with numpy) the next time a face is picked instead of being rebuilt
+ - Boxes hold the X and Y extents of the faces in view space (before flattening to Z = 0) so that a screen position
+   is a ray along Z, the tree is searched one level at a time and the nearest face containing the point is picked
+ - Pixels covered by a single face for highlighting the picked face on screen
+'''
+
+
+# Spread the lower 10 bits of every integer so that 2 zero bits separate each of them (for Morton codes)
+def spread_bits(v):
+        v = v.astype(np.uint64) & np.uint64(0x3ff)
+        v = (v | (v << np.uint64(16))) & np.uint64(0x30000ff)
+        v = (v | (v << np.uint64(8))) & np.uint64(0x300f00f)
+        v = (v | (v << np.uint64(4))) & np.uint64(0x30c30c3)
+        v = (v | (v << np.uint64(2))) & np.uint64(0x9249249)
+        return v
+
+
+class FaceBVH:
+        def __init__(self, geometry, leaf_size=8):
+                self.num_faces = int((geometry.shape[0])/3)  # Every 3 points represents a single face (length/3)
+                self.leaf_size = leaf_size
+
+                # Order the faces along a Morton curve through the centroids (quantized to 1024 steps per axis)
+                centroid = geometry[:, 0:3].reshape((-1, 3, 3)).mean(axis=1)
+                low, high = centroid.min(axis=0), centroid.max(axis=0)
+                grid = np.floor(1023*(centroid - low)/np.where(high > low, high - low, 1.0))
+                code = spread_bits(grid[:, 0]) | (spread_bits(grid[:, 1]) << np.uint64(1)) | \
+                    (spread_bits(grid[:, 2]) << np.uint64(2))
+                self.order = np.argsort(code, kind='stable')
+
+                # Complete binary tree over the leaves (padded to a power of 2 with empty leaves)
+                num_leaves = max(1, -(-self.num_faces//leaf_size))
+                self.depth = int(np.ceil(np.log2(num_leaves)))
+                self.first_leaf = 2**self.depth  # Node number of the first leaf (the root is node 1)
+                self.low = None  # Minimum X and Y of every node, set by refit
+                self.high = None  # Maximum X and Y of every node, set by refit
+                self.view = None  # View space geometry the bounds were computed from
+
+        # Recompute the node bounds for the view space geometry of the same faces
+        def refit(self, view_geometry):
+                self.view = view_geometry
+                tri = view_geometry[:, 0:2].reshape((-1, 3, 2))
+                size = self.first_leaf*self.leaf_size
+                low = np.full((size, 2), np.inf)
+                high = np.full((size, 2), -np.inf)  # Empty leaves can never contain a point
+                low[:self.num_faces] = tri.min(axis=1)[self.order]  # Faces in the order of the leaves
+                high[:self.num_faces] = tri.max(axis=1)[self.order]
+
+                self.low = np.empty((2*self.first_leaf, 2))
+                self.high = np.empty((2*self.first_leaf, 2))
+                self.low[self.first_leaf:] = low.reshape((-1, self.leaf_size, 2)).min(axis=1)
+                self.high[self.first_leaf:] = high.reshape((-1, self.leaf_size, 2)).max(axis=1)
+                # Each level up holds the union of the two children boxes
+                for level in range(self.depth - 1, -1, -1):
+                        first, last = 2**level, 2**(level + 1)
+                        self.low[first:last] = np.minimum(self.low[2*first:2*last:2], self.low[2*first+1:2*last:2])
+                        self.high[first:last] = np.maximum(self.high[2*first:2*last:2], self.high[2*first+1:2*last:2])
+
+        # Return the face nearest the viewer that contains the view space point (x, y), or -1 if there is none
+        def pick(self, x, y):
+                nodes = np.array([1])
+                if not (self.low[1, 0] <= x <= self.high[1, 0] and self.low[1, 1] <= y <= self.high[1, 1]):
+                        return -1
+                # Keep the children whose boxes contain the point, one level at a time down to the leaves
+                for level in range(self.depth):
+                        nodes = np.concatenate((2*nodes, 2*nodes + 1))
+                        inside = (self.low[nodes, 0] <= x) & (x <= self.high[nodes, 0]) & \
+                                 (self.low[nodes, 1] <= y) & (y <= self.high[nodes, 1])
+                        nodes = nodes[inside]
+                        if nodes.shape[0] == 0:
+                                return -1
+
+                # Faces of the remaining leaves
+                index = ((nodes - self.first_leaf)[:, None]*self.leaf_size + np.arange(self.leaf_size)).reshape(-1)
+                faces = self.order[index[index < self.num_faces]]
+                tri = self.view[:, 0:3].reshape((-1, 3, 3))[faces]
+
+                # Barycentric coordinates of the point in every face projected on the screen
+                a, b, c = tri[:, 0], tri[:, 1], tri[:, 2]
+                area = (b[:, 0] - a[:, 0])*(c[:, 1] - a[:, 1]) - (c[:, 0] - a[:, 0])*(b[:, 1] - a[:, 1])
+                u = ((b[:, 0] - x)*(c[:, 1] - y) - (c[:, 0] - x)*(b[:, 1] - y))
+                v = ((c[:, 0] - x)*(a[:, 1] - y) - (a[:, 0] - x)*(c[:, 1] - y))
+                safe = np.where(area != 0, area, 1.0)
+                u, v = u/safe, v/safe
+                w = 1 - u - v
+                hit = (area != 0) & (u >= 0) & (v >= 0) & (w >= 0)
+                if not np.any(hit):
+                        return -1
+                # Camera-facing faces have view space normals along -Z, so the nearest face has the smallest Z
+                depth = u*a[:, 2] + v*b[:, 2] + w*c[:, 2]
+                depth[~hit] = np.inf
+                return int(faces[np.argmin(depth)])
+
+
+# Screen pixels [x][y] covered by a face given by its 3 view space points (centered on the screen)
+def face_pixels(tri, width, height):
+        xy = tri[:, 0:2] + [width/2, height/2]
+        x0, y0 = np.maximum(np.floor(xy.min(axis=0)).astype(int), 0)
+        x1, y1 = np.minimum(np.ceil(xy.max(axis=0)).astype(int), [width - 1, height - 1])
+        if x1 < x0 or y1 < y0:
+                return np.zeros(0, dtype=int), np.zeros(0, dtype=int)
+        x, y = np.meshgrid(np.arange(x0, x1 + 1), np.arange(y0, y1 + 1), indexing='ij')
+        x, y = x.reshape(-1), y.reshape(-1)
+
+        # Same sign of all 3 edge functions (either winding)
+        a, b, c = xy
+        e0 = (b[0] - a[0])*(y - a[1]) - (b[1] - a[1])*(x - a[0])
+        e1 = (c[0] - b[0])*(y - b[1]) - (c[1] - b[1])*(x - b[0])
+        e2 = (a[0] - c[0])*(y - c[1]) - (a[1] - c[1])*(x - c[0])
+        inside = ((e0 >= 0) & (e1 >= 0) & (e2 >= 0)) | ((e0 <= 0) & (e1 <= 0) & (e2 <= 0))
+        return x[inside], y[inside]
@@ -6,6 +6,9 @@ Code to draw lines between vertices of STL faces
  - Each row represents a point and every 3 rows represents a connected object face w/ associated normal vector
  - Clip lines using a line clipping algorithm (50px within each edge of the passed display screen resolution)
  - Draws lines using a version of the Bresenham's Line Algorithm between every face point
+ - Can instead draw a selected set of edges (such as feature and silhouette edges) between pairs of points
+ - Vectorized version for very large images, returns only the line pixels of each segment inside a window
+ - Converts the resulting line points into an RGB pixel array of the display screen
 
 Evan Chodora, 2018
 https://github.com/evanchodora/viewer
@@ -51,6 +54,79 @@ def draw_lines(geometry, normal, camera, view, width, height):
         return line_points
 
 
+# Draw lines for selected edges given as pairs of point rows of the geometry (all lines are drawn as front facing)
+def draw_edges(geometry, points, width, height):
+        geometry = np.around(geometry)  # Round geometry values to integer values for pixel mapping
+        geometry = geometry.astype(int)  # Convert geometry matrix to integer data type
+        start = geometry[points[:, 0], 0:2].tolist()  # X and Y of the first point of every edge
+        end = geometry[points[:, 1], 0:2].tolist()  # X and Y of the second point of every edge
+        line_points = []
+        xmin, xmax = 0 - (width - 100)/2, 0 + (width - 100)/2  # X extremes of the clipping region (50px inside)
+        ymin, ymax = 0 - (height - 100)/2, 0 + (height - 100)/2  # Y extremes of the clipping region (50px inside)
+
+        for e in range(0, len(start)):  # Loop every selected edge
+                # Clip each edge based on the clipping window
+                x1, y1, x2, y2 = clipping(start[e][0], start[e][1], end[e][0], end[e][1], xmin, xmax, ymin, ymax)
+                if x1 != 9999:  # Check if line has any points within screen to draw
+                        line_points.append(line_algo(x1, y1, x2, y2, 1))
+
+        line_points = [item for sublist in line_points for item in sublist]  # Flatten list sets into an array
+        return np.asarray(line_points).reshape((-1, 3))  # Reshape and convert to XY numpy array for plotting
+
+
+# Pixels of line segments [x1 y1 x2 y2] (image pixel coordinates) that fall inside a window, computed with numpy
+# Each segment is stepped along its longer axis between its rounded end points and clipped by its parameter range
+# (Liang-Barsky), so that the pixels of a segment are the same no matter how the image is split into windows
+def segment_pixels(segments, xmin, xmax, ymin, ymax):
+        start = np.around(segments[:, 0:2])
+        delta = np.around(segments[:, 2:4]) - start
+        steps = np.max(np.abs(delta), axis=1)  # Number of pixel steps along the longer axis
+
+        # Parameter range (0 to 1 along the segment) inside the window grown by half a pixel on every side
+        t0, t1 = np.zeros(steps.shape), np.ones(steps.shape)
+        keep = np.ones(steps.shape, dtype=bool)
+        for p, q in ((-delta[:, 0], start[:, 0] - (xmin - 0.5)), (delta[:, 0], (xmax + 0.5) - start[:, 0]),
+                     (-delta[:, 1], start[:, 1] - (ymin - 0.5)), (delta[:, 1], (ymax + 0.5) - start[:, 1])):
+                keep &= (p != 0) | (q >= 0)  # Reject segments parallel to and outside of a window edge
+                with np.errstate(divide='ignore', invalid='ignore'):
+                        r = q/p
+                t0 = np.where(p < 0, np.maximum(t0, r), t0)
+                t1 = np.where(p > 0, np.minimum(t1, r), t1)
+
+        # Range of pixel steps inside the window for every segment
+        first = np.ceil(t0*steps - 1e-9).astype(int)
+        last = np.floor(t1*steps + 1e-9).astype(int)
+        keep &= last >= first
+        segment = np.flatnonzero(keep)
+        counts = (last - first + 1)[segment]
+
+        # Expand every kept segment into its pixel steps
+        index = np.repeat(segment, counts)
+        step = first[index] + np.arange(index.shape[0]) - np.repeat(np.cumsum(counts) - counts, counts)
+        fraction = step/np.maximum(steps[index], 1)
+        x = (start[index, 0] + np.around(fraction*delta[index, 0])).astype(int)
+        y = (start[index, 1] + np.around(fraction*delta[index, 1])).astype(int)
+        inside = (x >= xmin) & (x <= xmax) & (y >= ymin) & (y <= ymax)
+        return x[inside], y[inside], index[inside]
+
+
+# Convert line points from draw_lines into an RGB pixel array indexed [x][y] with the origin at the screen center
+def rasterize(line_points, view, width, height):
+        pixels = np.full((width, height, 3), 255, dtype=np.uint8)  # Clear pixel array to white
+        x = (width/2 + line_points[:, 0]).astype(int)  # X coordinate (0,0 of screen is top left)
+        y = (height/2 + line_points[:, 1]).astype(int)  # Y coordinate (0,0 of screen is top left)
+        # Plot grey lines only if grey lines are selected (drawn first so black lines always cover them)
+        if view == 'grey':
+                back = line_points[:, 2] == 0
+                pixels[x[back], y[back]] = (210, 210, 210)  # Color = grey
+        # Plot all front facing lines and back facing when wireplot is selected
+        front = line_points[:, 2] == 1
+        if view == 'wire':
+                front[:] = True
+        pixels[x[front], y[front]] = (0, 0, 0)  # Color = black
+        return pixels
+
+
 def line_algo(x0, y0, x1, y1, front):
         # Calculate line points using an adapted version of the Bresenham's Line Algorithm
         # https://en.wikipedia.org/wiki/Bresenham%27s_line_algorithm
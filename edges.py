@@ -0,0 +1,61 @@
+import numpy as np
+
+'''
+Code to find the feature and silhouette edges of an STL object to draw instead of every triangle edge
+ - Welds the face vertices (within weld times the object size) and builds the edge to face adjacency once
+   the first time the object is drawn in the feature edge view
+ - Stores the dihedral angle between the two faces of every edge (open boundary edges are always feature edges)
+ - Feature edges have a dihedral angle above the chosen threshold, most tessellation edges are near 0 degrees
+ - Silhouette edges have one camera-facing and one rearward face and are found for every frame with the same
+   face orientation test as draw_lines (outward normal dotted with the camera vector)
+'''
+
+
+class EdgeSet:
+        def __init__(self, geometry, weld=1e-4):
+                num_faces = int((geometry.shape[0])/3)  # Every 3 points represents a single face (length/3)
+                # Weld vertices closer than a small fraction of the object size so that neighboring faces share
+                # their edges (STL files often round the same vertex differently in neighboring faces)
+                size = np.linalg.norm(np.max(geometry[:, 0:3], axis=0) - np.min(geometry[:, 0:3], axis=0))
+                grid = np.around(geometry[:, 0:3]/(weld*size if size > 0 else 1.0))
+                _, first, vertex = np.unique(grid, axis=0, return_index=True, return_inverse=True)
+                vertex = vertex.reshape(-1)
+                face = np.arange(num_faces)
+
+                # The 3 edges of every face as pairs of welded vertices (smallest vertex first)
+                a = vertex.reshape((-1, 3))
+                pairs = np.concatenate((a[:, [0, 1]], a[:, [1, 2]], a[:, [2, 0]]))
+                pairs = np.sort(pairs, axis=1)
+                faces = np.concatenate((face, face, face))
+                edges, start, inverse = np.unique(pairs, axis=0, return_index=True, return_inverse=True)
+                inverse = inverse.reshape(-1)
+
+                # Adjacent faces of every edge, the second face is -1 for open boundary edges
+                order = np.argsort(inverse, kind='stable')
+                counts = np.bincount(inverse, minlength=edges.shape[0])
+                offsets = np.concatenate(([0], np.cumsum(counts)[:-1]))
+                self.faces = np.full((edges.shape[0], 2), -1)
+                self.faces[:, 0] = faces[order[offsets]]
+                shared = counts > 1
+                self.faces[shared, 1] = faces[order[offsets[shared] + 1]]
+
+                # Point rows in the geometry array for the two ends of every edge
+                self.points = first[edges]
+
+                # Dihedral angle between the face normals computed from the vertices (degrees)
+                tri = geometry[:, 0:3].reshape((-1, 3, 3))
+                normal = np.cross(tri[:, 1] - tri[:, 0], tri[:, 2] - tri[:, 0])
+                length = np.linalg.norm(normal, axis=1)
+                normal = normal/np.where(length > 0, length, 1.0)[:, None]
+                cos = np.sum(normal[self.faces[:, 0]]*normal[self.faces[:, 1]], axis=1)
+                self.angle = np.degrees(np.arccos(np.clip(cos, -1.0, 1.0)))
+                self.angle[~shared] = 180.0
+
+        # Select the feature edges above the angle threshold and the silhouette edges for the current view
+        def visible(self, normal, camera, threshold):
+                front = np.dot(normal[:, 0:3], camera) < 0.0  # Camera-facing faces (same test as draw_lines)
+                front_0 = front[self.faces[:, 0]]
+                front_1 = np.where(self.faces[:, 1] >= 0, front[self.faces[:, 1]], False)
+                silhouette = (self.faces[:, 1] >= 0) & (front_0 != front_1)
+                feature = (self.angle > threshold) & (front_0 | front_1)
+                return silhouette | feature, front
@@ -14,6 +14,12 @@ https://github.com/evanchodora/viewer
 echodor@clemson.edu
 '''
 
+# Flatten projected geometry to Z = 0
+FLAT = np.array([[1, 0, 0, 0],
+                 [0, 1, 0, 0],
+                 [0, 0, 0, 0],
+                 [0, 0, 0, 1]])
+
 
 # Determine the transform that should be applied to the geometry (data is specific data for each transformation)
 def transform(geometry, normals, transtype, data):
@@ -86,38 +92,42 @@ def rotation(geometry, normals, axis, ang):
 
 # Flatten and rotate geometry according to type of orthographic view
 def ortho(geometry, normals, view):
+        mat, rot = ortho_matrix(view)
+        geometry = np.dot(geometry, mat)  # Flatten the axis pointing at the viewer
+        geometry = geometry.dot(rot)
+        normals = normals.dot(rot)
+        return geometry, normals
+
+
+# Build the flattening and rotation matrices of an orthographic view
+def ortho_matrix(view):
         mat = np.identity(4)  # Initialize transformation matrix
+        rot = np.identity(4)
 
-        # Determine which of the 6 orthographic views is requested and apply the transformation/rotation
+        # Determine which of the 6 orthographic views is requested and build the transformation/rotation
         # Views are referenced according to the original geometry orientation (front = +Z, top = +Y, right = +X, etc.)
         if view == 'top':
                 mat[1, 1] = 0
-                geometry = np.dot(geometry, mat)
-                geometry, normals = rotation(geometry, normals, 1, 90)
+                rot, _ = rotation(rot, rot, 1, 90)
         if view == 'bottom':
                 mat[1, 1] = 0
-                geometry = np.dot(geometry, mat)
-                geometry, normals = rotation(geometry, normals, 1, -90)
+                rot, _ = rotation(rot, rot, 1, -90)
         if view == 'right':
                 mat[0, 0] = 0
-                geometry = np.dot(geometry, mat)
-                geometry, normals = rotation(geometry, normals, 2, 90)
+                rot, _ = rotation(rot, rot, 2, 90)
         if view == 'left':
                 mat[0, 0] = 0
-                geometry = np.dot(geometry, mat)
-                geometry, normals = rotation(geometry, normals, 2, -90)
+                rot, _ = rotation(rot, rot, 2, -90)
         if view == 'front':
                 mat[2, 2] = 0
-                geometry = np.dot(geometry, mat)
         if view == 'back':
                 mat[2, 2] = 0
-                geometry = np.dot(geometry, mat)
-                geometry, normals = rotation(geometry, normals, 2, 180)
-        return geometry, normals
+                rot, _ = rotation(rot, rot, 2, 180)
+        return mat, rot
 
 
-# Project geometry with isometric projection
-def perspective(persp, geometry, fz, phi, theta):
+# Build the rotation matrix and camera vector for the chosen perspective (without flattening to Z = 0)
+def perspective_matrix(persp, fz, phi, theta):
 
         if persp == 'iso':  # Isometric perspective (constant value for rotations - no variables)
                 phi = m.radians(45)  # Rotation about Y
@@ -139,19 +149,22 @@ def perspective(persp, geometry, fz, phi, theta):
                           [0.0, m.cos(theta),    m.sin(theta), 0.0],
                           [0.0, -1*m.sin(theta), m.cos(theta), 0.0],
                           [0.0, 0.0,             0.0,          1.0]])
-        flat = np.array([[1, 0, 0, 0],
-                         [0, 1, 0, 0],
-                         [0, 0, 0, 0],
-                         [0, 0, 0, 1]])
-
-        # Apply transformations to the geometry for the chosen perspective
-        geometry = geometry.dot(rot_1)  # Rotation about Y
-        geometry = geometry.dot(rot_2)  # Rotation about X
-        geometry = geometry.dot(flat)  # Flatten to Z = 0
 
         # Apply same rotations to camera vector (but in the opposite order)
         camera = np.array([0, 0, -1, 1]).dot(rot_2)
         camera = camera.dot(rot_1)
         camera = np.array([camera[0], camera[1], -1*camera[2]])  # Camera vector for determining face orientation
 
+        return rot_1.dot(rot_2), camera
+
+
+# Project geometry with isometric projection
+def perspective(persp, geometry, fz, phi, theta):
+
+        rot, camera = perspective_matrix(persp, fz, phi, theta)
+
+        # Apply transformations to the geometry for the chosen perspective
+        geometry = geometry.dot(rot)  # Rotation about Y then about X
+        geometry = geometry.dot(FLAT)  # Flatten to Z = 0
+
         return geometry, camera
@@ -0,0 +1,201 @@
+import numpy as np
+import io
+import struct
+import zlib
+
+'''
+Code to write rendered pixel arrays to PNG and animated GIF image files without any imaging library
+ - Pixel arrays are indexed [x][y] with RGB color values (same layout as the pygame pixel array)
+ - PNG files can be written all at once or streamed a band of rows at a time with PNGWriter
+ - Tiled TIFF files are streamed one tile at a time with TIFFWriter (deflate compressed tiles)
+ - GIF frames are LZW compressed separately so that they can be encoded in parallel and joined afterwards
+ - GIFs use a fixed palette of the viewer colors (white, grey and black)
+'''
+
+# Fixed GIF palette of the colors used when drawing the object (white background, grey and black lines)
+PALETTE = np.array([[255, 255, 255],
+                    [210, 210, 210],
+                    [0, 0, 0],
+                    [0, 0, 0]], dtype=np.uint8)
+
+
+# Write a single PNG chunk (length, type, data, CRC)
+def png_chunk(fp, kind, data):
+        fp.write(struct.pack('>I', len(data)))
+        fp.write(kind + data)
+        fp.write(struct.pack('>I', zlib.crc32(kind + data) & 0xffffffff))
+
+
+# Stream an 8 bit RGB PNG image to an open binary file a band of rows at a time
+class PNGWriter:
+        def __init__(self, fp, width, height):
+                self.fp = fp
+                self.width = width
+                self.compress = zlib.compressobj(6)
+                fp.write(b'\x89PNG\r\n\x1a\n')  # PNG signature
+                png_chunk(fp, b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0))
+
+        # Append rows indexed [y][x] (height x width x 3) to the image data
+        def write_rows(self, rows):
+                rows = rows.reshape((-1, 3*self.width))
+                # Compress a few rows at a time to avoid copying large bands of rows
+                for start in range(0, rows.shape[0], 64):
+                        band = rows[start:start+64].astype(np.uint8)
+                        # Every row starts with a filter type byte (0 = no filter)
+                        data = np.concatenate((np.zeros((band.shape[0], 1), dtype=np.uint8), band), axis=1)
+                        compressed = self.compress.compress(data.tobytes())
+                        if len(compressed) > 0:
+                                png_chunk(self.fp, b'IDAT', compressed)
+
+        def close(self):
+                png_chunk(self.fp, b'IDAT', self.compress.flush())
+                png_chunk(self.fp, b'IEND', b'')
+
+
+# Encode a pixel array indexed [x][y] as PNG file data
+def png_bytes(pixels):
+        fp = io.BytesIO()
+        writer = PNGWriter(fp, pixels.shape[0], pixels.shape[1])
+        writer.write_rows(pixels.transpose((1, 0, 2)))  # Rows are written top to bottom
+        writer.close()
+        return fp.getvalue()
+
+
+# Write a pixel array indexed [x][y] to a PNG file
+def write_png(filename, pixels):
+        fp = open(filename, 'wb')
+        fp.write(png_bytes(pixels))
+        fp.close()
+
+
+# Stream an 8 bit RGB tiled TIFF image to an open binary file one tile at a time
+class TIFFWriter:
+        def __init__(self, fp, width, height, tile):
+                if tile <= 0 or tile % 16 != 0:
+                        raise ValueError('TIFF tile size must be a multiple of 16: %d' % tile)
+                self.fp = fp
+                self.width, self.height, self.tile = width, height, tile
+                self.offsets = []  # File offset of every tile written
+                self.counts = []  # Compressed byte count of every tile written
+                fp.write(b'II*\x00' + struct.pack('<I', 0))  # Little endian header, IFD offset is filled in on close
+
+        # Append the next tile indexed [y][x] (tiles go left to right, then top to bottom)
+        def write_tile(self, rows):
+                # Tiles at the right and bottom edges are padded to the full tile size
+                full = np.zeros((self.tile, self.tile, 3), dtype=np.uint8)
+                full[0:rows.shape[0], 0:rows.shape[1]] = rows
+                data = zlib.compress(full.tobytes(), 6)
+                self.offsets.append(self.fp.tell())
+                self.counts.append(len(data))
+                self.fp.write(data)
+
+        def close(self):
+                # Arrays of values that don't fit in a tag are stored before the image file directory
+                fp = self.fp
+                if fp.tell() % 2 == 1:
+                        fp.write(b'\x00')  # Word align
+                bits = fp.tell()
+                fp.write(struct.pack('<3H', 8, 8, 8))
+                offsets = fp.tell()
+                fp.write(struct.pack('<%dI' % len(self.offsets), *self.offsets))
+                counts = fp.tell()
+                fp.write(struct.pack('<%dI' % len(self.counts), *self.counts))
+                tags = [(256, 4, 1, self.width),  # Image width
+                        (257, 4, 1, self.height),  # Image length
+                        (258, 3, 3, bits),  # Bits per sample
+                        (259, 3, 1, 8),  # Compression (deflate)
+                        (262, 3, 1, 2),  # Photometric interpretation (RGB)
+                        (277, 3, 1, 3),  # Samples per pixel
+                        (284, 3, 1, 1),  # Planar configuration (chunky)
+                        (322, 4, 1, self.tile),  # Tile width
+                        (323, 4, 1, self.tile),  # Tile length
+                        (324, 4, len(self.offsets), offsets if len(self.offsets) > 1 else self.offsets[0]),
+                        (325, 4, len(self.counts), counts if len(self.counts) > 1 else self.counts[0])]
+                ifd = fp.tell()
+                fp.write(struct.pack('<H', len(tags)))
+                for tag, kind, count, value in tags:
+                        if kind == 3 and count == 1:
+                                fp.write(struct.pack('<HHIHH', tag, kind, count, value, 0))
+                        else:
+                                fp.write(struct.pack('<HHII', tag, kind, count, value))
+                fp.write(struct.pack('<I', 0))  # No more image file directories
+                fp.seek(4)
+                fp.write(struct.pack('<I', ifd))
+
+
+# LZW compress a pixel array indexed [x][y] into the image data sub-blocks of a single GIF frame
+def gif_frame(pixels):
+        # Map every pixel to its palette index (white = 0, grey = 1, black = 2)
+        index = np.zeros(pixels.shape[0:2], dtype=np.uint8)
+        index[pixels[:, :, 0] == 210] = 1
+        index[pixels[:, :, 0] == 0] = 2
+        data = lzw(index.T.tobytes(), 2)  # Rows are stored top to bottom
+        # Split compressed data into sub-blocks of at most 255 bytes each, ending with an empty block
+        blocks = bytearray([2])  # LZW minimum code size
+        for start in range(0, len(data), 255):
+                block = data[start:start+255]
+                blocks += bytes([len(block)]) + block
+        blocks += b'\x00'
+        return bytes(blocks)
+
+
+# Variable code length LZW compression used by the GIF format
+def lzw(data, min_size):
+        clear = 1 << min_size  # Clear code resets the code table
+        end = clear + 1  # End of information code
+        size = min_size + 1
+        table = {}  # Code of every known string keyed by (code of the string without its last value, last value)
+        next_code = end + 1
+        out = bytearray()
+        buffer, bits = clear, size  # Start the stream with a clear code
+
+        code = data[0]  # Code of the longest known string so far (single values are their own codes)
+        for value in data[1:]:
+                key = (code << 8) | value
+                known = table.get(key)
+                if known is not None:
+                        code = known
+                        continue
+                buffer |= code << bits  # Output the code of the longest known string
+                bits += size
+                if next_code < 4096:
+                        table[key] = next_code
+                        next_code += 1
+                        if next_code > (1 << size) and size < 12:
+                                size += 1
+                else:
+                        # Code table is full, clear it and start over
+                        buffer |= clear << bits
+                        bits += size
+                        table = {}
+                        next_code = end + 1
+                        size = min_size + 1
+                code = value
+                while bits >= 8:
+                        out.append(buffer & 0xff)
+                        buffer >>= 8
+                        bits -= 8
+
+        buffer |= code << bits
+        bits += size
+        buffer |= end << bits
+        bits += size
+        while bits > 0:
+                out.append(buffer & 0xff)
+                buffer >>= 8
+                bits -= 8
+        return bytes(out)
+
+
+# Write an animated GIF from frames encoded with gif_frame (delay between frames in milliseconds)
+def write_gif(filename, frames, width, height, delay):
+        fp = open(filename, 'wb')
+        fp.write(b'GIF89a' + struct.pack('<HHBBB', width, height, 0x91, 0, 0))  # 4 color global palette
+        fp.write(PALETTE.tobytes())
+        fp.write(b'\x21\xff\x0bNETSCAPE2.0\x03\x01\x00\x00\x00')  # Loop the animation forever
+        for frame in frames:
+                fp.write(b'\x21\xf9\x04\x00' + struct.pack('<H', int(round(delay/10.0))) + b'\x00\x00')
+                fp.write(b'\x2c' + struct.pack('<HHHHB', 0, 0, width, height, 0))  # Full size image descriptor
+                fp.write(frame)
+        fp.write(b'\x3b')  # GIF trailer
+        fp.close()
@@ -14,16 +14,24 @@ echodor@clemson.edu
 
 def orient(geometry, width, height):
 
+        geometry = geometry.dot(orient_matrix(geometry, width, height))  # Center and scale object accordingly
+
+        return geometry
+
+
+# Compute the transformation matrix that centers the geometry on the origin and scales it to fit the window
+def orient_matrix(geometry, width, height):
+
         # Compute object dimensions and distance from the origin
         max_size = np.max(geometry, axis=0)  # Max X,Y,Z values of the object
         min_size = np.min(geometry, axis=0)  # Min X,Y,Z values of the object
         x_trans = 0 - 0.5*(max_size[0]+min_size[0])  # Avg X distance from the origin (center of the object)
         y_trans = 0 - 0.5*(max_size[1]+min_size[1])  # Avg Y distance from the origin (center of the object)
         z_trans = 0 - 0.5*(max_size[2]+min_size[2])  # Avg Z distance from the origin (center of the object)
-        geometry = gtransform.translate(geometry, x_trans, y_trans, z_trans)  # Translate object accordingly to origin
+        mat = gtransform.translate(np.identity(4), x_trans, y_trans, z_trans)  # Translate object accordingly to origin
 
         # Compute scaling to center object in the screen
-        geometry_scale, _ = gtransform.perspective('iso', geometry, None, None, None)  # Apply isometric perspective
+        geometry_scale, _ = gtransform.perspective('iso', geometry.dot(mat), None, None, None)  # Isometric perspective
         max_size = np.max(geometry_scale, axis=0)  # Max X and Y values of projected point cloud on display (Z = 0)
         scale = 1
         # Based on whether the object is larger in width or height when projected, apply a scaling factor
@@ -32,6 +40,6 @@ def orient(geometry, width, height):
                 scale = (0.5*width)/(2*max_size[0])
         if max_size[0] < max_size[1]:
                 scale = (0.5*height)/(2*max_size[1])
-        geometry = gtransform.scale(geometry, 1/scale)  # Apply global scaling with appropriate factor
+        mat = gtransform.scale(mat, 1/scale)  # Apply global scaling with appropriate factor
 
-        return geometry
+        return mat
@@ -0,0 +1,168 @@
+import numpy as np
+import os
+import shlex
+import gtransform
+from orient import orient_matrix
+from drawlines import draw_lines, draw_edges
+from edges import EdgeSet
+from stlfile import read_stl
+
+'''
+Code to hold a scene of several STL models placed as instances of shared meshes
+ - Every STL file is read once into a Mesh and shared by all of its instances (no copies of the geometry)
+ - An instance is a (mesh, 4x4 transform) pair using the same row-vector convention as gtransform
+ - Instances are only expanded while projecting, in batches of instances per matrix product
+ - Instances whose projected bounding box is entirely outside of the clipping region are skipped
+ - Scene files list one instance per line: the STL path followed by an optional X Y Z translation
+   or the 16 values of the full 4x4 transform (row by row), "#" starts a comment
+'''
+
+
+# Shared STL geometry used by every instance of the same file
+class Mesh:
+        def __init__(self, filename):
+                self.filename = filename
+                self.name, self.geometry, self.normal = read_stl(filename)
+                self.edges = None  # Edges for the feature edge view, built the first time they are drawn
+                # Store the 8 corners of the axis-aligned bounding box in form [x y z h] for culling instances
+                low, high = np.min(self.geometry, axis=0), np.max(self.geometry, axis=0)
+                self.corners = np.array([[x, y, z, 1.0] for x in (low[0], high[0]) for y in (low[1], high[1])
+                                         for z in (low[2], high[2])])
+
+        # Return the edges of the mesh for the feature edge view (found once, the first time they are needed)
+        def edge_set(self):
+                if self.edges is None:
+                        self.edges = EdgeSet(self.geometry)
+                return self.edges
+
+
+# Placement of a mesh in the scene
+class Instance:
+        def __init__(self, mesh, transform):
+                self.mesh = mesh
+                self.transform = np.asarray(transform, dtype=float).reshape((4, 4))
+                # Normals only follow the rotation (inverse transpose of the upper 3x3) and never the translation
+                self.normal_transform = np.identity(4)
+                self.normal_transform[0:3, 0:3] = np.linalg.inv(self.transform[0:3, 0:3]).T
+
+
+class Scene:
+        batch = 32  # Number of instances expanded together in a single projection
+
+        def __init__(self):
+                self.meshes = {}  # Loaded meshes by file path (each file is only read once)
+                self.instances = []
+                self.name = ''
+                self.fit = np.identity(4)  # Centers and scales the whole scene to the display window
+                self.edge_counts = None  # Edges drawn and camera-facing triangle edges of the last feature edge view
+                self.reset()
+
+        # Clear any accumulated rotation, zoom and panning of the scene
+        def reset(self):
+                self.view_geometry = np.identity(4)
+                self.view_normals = np.identity(4)
+
+        # Return the shared mesh for an STL file, loading it only the first time it is requested
+        def load_mesh(self, filename):
+                key = os.path.abspath(filename)
+                if key not in self.meshes:
+                        self.meshes[key] = Mesh(filename)
+                return self.meshes[key]
+
+        # Place a new instance of an STL file in the scene (identity transform if none is given)
+        def add(self, filename, transform=None):
+                if transform is None:
+                        transform = np.identity(4)
+                instance = Instance(self.load_mesh(filename), transform)
+                self.instances.append(instance)
+                return instance
+
+        # Read a scene file of instances, STL paths are relative to the scene file location
+        def load_scene(self, filename):
+                self.name = os.path.basename(filename)
+                folder = os.path.dirname(os.path.abspath(filename))
+                fp = open(filename, 'r')
+                for line in fp.readlines():
+                        parts = shlex.split(line, comments=True)  # Allow quoted paths with spaces
+                        if len(parts) == 0:
+                                continue
+                        values = [float(v) for v in parts[1:]]
+                        if len(values) == 0:
+                                transform = np.identity(4)
+                        elif len(values) == 3:
+                                transform = gtransform.translate(np.identity(4), values[0], values[1], values[2])
+                        elif len(values) == 16:
+                                transform = np.array(values).reshape((4, 4))
+                        else:
+                                fp.close()
+                                raise ValueError('Scene line must give 0, 3 or 16 transform values: ' + line.strip())
+                        self.add(os.path.join(folder, parts[0]), transform)
+                fp.close()
+                if len(self.instances) == 0:
+                        raise ValueError('Scene has no instances: ' + filename)
+
+        # Center and scale the scene to fit within a window of the supplied width and height
+        def fit_window(self, width, height):
+                # Use the placed bounding box corners of every instance rather than the full geometry
+                corners = np.concatenate([i.mesh.corners.dot(i.transform) for i in self.instances])
+                self.fit = orient_matrix(corners, width, height)
+                self.reset()
+
+        # Apply a rotation, zoom or translation to the whole scene (see gtransform.transform)
+        def transform(self, transtype, data):
+                self.view_geometry, self.view_normals = gtransform.transform(self.view_geometry, self.view_normals,
+                                                                             transtype, data)
+
+        # Project every visible instance and return the line points to plot (same output as draw_lines)
+        def draw(self, persp, fz, phi, theta, view, width, height, ortho=None, feature_angle=30):
+                if ortho is None:
+                        # Apply selected perspective with appropriate settings of fz, phi, and theta
+                        rot, camera = gtransform.perspective_matrix(persp, fz, phi, theta)
+                        geometry_mat = self.fit.dot(self.view_geometry).dot(rot).dot(gtransform.FLAT)
+                        normal_mat = self.view_normals
+                else:
+                        # Orthographic views are always shown from the original scene orientation
+                        geometry_mat, normal_mat = gtransform.transform(self.fit, np.identity(4), 'ortho', ortho)
+                        camera = [0, 0, 1]
+
+                xmin, xmax = 0 - (width - 100)/2, 0 + (width - 100)/2  # X extremes of the clipping region
+                ymin, ymax = 0 - (height - 100)/2, 0 + (height - 100)/2  # Y extremes of the clipping region
+                points = []
+                self.edge_counts = (0, 0) if view == 'edge' else None
+                for mesh in self.meshes.values():
+                        instances = [i for i in self.instances if i.mesh is mesh]
+                        if len(instances) == 0:
+                                continue
+                        # Full projection matrix of every instance of this mesh (K x 4 x 4)
+                        mats = np.matmul(np.array([i.transform for i in instances]), geometry_mat)
+                        normal_mats = np.matmul(np.array([i.normal_transform for i in instances]), normal_mat)
+
+                        # Skip instances whose projected bounding box lies entirely outside of the clipping region
+                        box = np.matmul(mesh.corners, mats)  # K x 8 x 4
+                        low, high = np.min(box, axis=1), np.max(box, axis=1)
+                        visible = ((high[:, 0] >= xmin) & (low[:, 0] <= xmax) &
+                                   (high[:, 1] >= ymin) & (low[:, 1] <= ymax))
+                        mats, normal_mats = mats[visible], normal_mats[visible]
+
+                        # Expand the shared geometry for a batch of instances at a time
+                        for start in range(0, mats.shape[0], self.batch):
+                                geometry = np.matmul(mesh.geometry, mats[start:start+self.batch]).reshape((-1, 4))
+                                normals = np.matmul(mesh.normal, normal_mats[start:start+self.batch]).reshape((-1, 4))
+                                if view != 'edge':
+                                        points.append(draw_lines(geometry, normals, camera, view, width, height))
+                                        continue
+                                # Feature and silhouette edges of each instance in the batch
+                                num_points, num_faces = mesh.geometry.shape[0], mesh.normal.shape[0]
+                                edges = mesh.edge_set()
+                                for i in range(int(geometry.shape[0]/num_points)):
+                                        visible, front = edges.visible(normals[i*num_faces:(i+1)*num_faces], camera,
+                                                                       feature_angle)
+                                        points.append(draw_edges(geometry[i*num_points:(i+1)*num_points],
+                                                                 edges.points[visible], width, height))
+                                        # Add up the edges drawn and the triangle edges of the hidden line view
+                                        drawn, total = self.edge_counts
+                                        self.edge_counts = (drawn + int(visible.sum()), total + 3*int(front.sum()))
+
+                if len(points) == 0:
+                        return np.zeros((0, 3), dtype=int)
+                return np.concatenate(points)
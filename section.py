@@ -0,0 +1,79 @@
+import numpy as np
+
+'''
+Code to cut cross sections through an STL object with a plane swept along an axis (or any normal vector)
+ - Sweep index built once per sweep direction: the distance of every face point along the normal, with the faces
+   sorted by their minimum and by their maximum distance
+ - Nearly all faces are short along the normal, so the faces straddling the plane are found from the short range of
+   faces starting within one face length before the plane (the few long faces are always checked)
+ - Only the straddling faces are cut, in vectorized batches, giving 2 edge crossings per face as rows of the geometry
+   and interpolation factors, so the same section can be placed on the original or the transformed geometry
+ - Faces entirely behind the plane (clipped model) are found from the faces sorted by their maximum distance
+'''
+
+
+class SweepIndex:
+        def __init__(self, geometry, normal, batch=65536):
+                self.normal = np.asarray(normal, dtype=float)[0:3]
+                self.normal = self.normal/np.linalg.norm(self.normal)  # Unit normal of the cutting plane
+                self.batch = batch  # Straddling faces cut at once
+                self.dist = geometry[:, 0:3].dot(self.normal).reshape((-1, 3))  # Distance of the 3 points of every face
+                low, high = self.dist.min(axis=1), self.dist.max(axis=1)
+                self.low, self.high = low.min(), high.max()  # Extent of the object along the normal
+
+                # Faces sorted by their minimum and by their maximum distance
+                self.by_low = np.argsort(low, kind='stable')
+                self.low_sorted = low[self.by_low]
+                self.by_high = np.argsort(high, kind='stable')
+                self.high_sorted = high[self.by_high]
+
+                # Longest 1% of faces are checked at every offset, the rest span at most "reach" along the normal
+                span = high - low
+                self.reach = np.percentile(span, 99)
+                self.long = np.flatnonzero(span > self.reach)
+                self.short = span[self.by_low] <= self.reach  # Short faces in the order of by_low
+
+        # Faces that straddle the plane at a distance along the normal
+        def straddling(self, offset):
+                # Short faces can only straddle the plane if they start within reach before it
+                first = np.searchsorted(self.low_sorted, offset - self.reach, side='left')
+                last = np.searchsorted(self.low_sorted, offset, side='right')
+                faces = np.concatenate((self.by_low[first:last][self.short[first:last]], self.long))
+                dist = self.dist[faces]
+                return faces[(dist.min(axis=1) <= offset) & (dist.max(axis=1) >= offset)]
+
+        # Faces entirely behind the plane (distance at most the offset)
+        def behind(self, offset):
+                return self.by_high[:np.searchsorted(self.high_sorted, offset, side='right')]
+
+        # Cut the straddling faces, returning the geometry rows at both ends of the 2 crossed edges of every face
+        # and the position of the crossing along each edge (one row per section line segment)
+        def cut(self, offset):
+                faces = self.straddling(offset)
+                start, end, t = [], [], []
+                for first in range(0, faces.shape[0], self.batch):
+                        f = faces[first:first + self.batch]
+                        d = self.dist[f] - offset
+                        above = d > 0
+                        # Edges 0-1, 1-2 and 2-0 cross the plane where their points are on opposite sides (a face
+                        # crosses on exactly 0 or 2 of its edges)
+                        i = np.array([0, 1, 2])
+                        j = np.array([1, 2, 0])
+                        crossed = above[:, i] != above[:, j]
+                        face, edge = np.nonzero(crossed)
+                        d_i, d_j = d[face, i[edge]], d[face, j[edge]]
+                        start.append((3*f[face] + i[edge]).reshape((-1, 2)))
+                        end.append((3*f[face] + j[edge]).reshape((-1, 2)))
+                        t.append((d_i/(d_i - d_j)).reshape((-1, 2)))
+                if len(t) == 0:
+                        return np.zeros((0, 2), dtype=int), np.zeros((0, 2), dtype=int), np.zeros((0, 2))
+                return np.concatenate(start), np.concatenate(end), np.concatenate(t)
+
+
+# Points of the section line segments on a geometry array with the same rows as the indexed geometry, returned
+# with the pairs of point rows making up every segment (for drawing with draw_edges)
+def contour(geometry, section):
+        start, end, t = section
+        a, b = geometry[start.reshape(-1)], geometry[end.reshape(-1)]
+        points = a + t.reshape((-1, 1))*(b - a)
+        return points, np.arange(points.shape[0]).reshape((-1, 2))
@@ -0,0 +1,258 @@
+import numpy as np
+import argparse
+import asyncio
+import json
+import os
+import socket
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+import gtransform
+import imagewrite
+from orient import orient
+from drawlines import draw_lines, rasterize
+from stlfile import read_stl
+
+'''
+Long-lived local render server that keeps recently used STL meshes loaded in memory
+ - Listens on a Unix domain socket or a localhost TCP port (asyncio)
+ - Requests are single lines of JSON, every response is a line of JSON followed by "length" bytes of image data
+ - Render request: {"file": "part.stl", "persp": "iso", "fz": 0.375, "phi": 45, "theta": 35, "view": "hide",
+   "ortho": null, "transforms": [["rotation", [2, 15]], ["zoom", [0.8]]], "width": 900, "height": 700}
+   (only "file" is required, "ortho" is one of the 6 orthographic views and "transforms" follow gtransform.transform)
+ - Stats request: {"cmd": "stats"} returns request latency percentiles and the mesh cache hit rate
+ - Meshes are kept in a least recently used cache bounded by the memory of the geometry arrays
+ - Number of renders running at once, waiting requests and the image size are all limited
+
+Usage: python server.py --port 8765
+       python server.py --socket /tmp/stlviewer.sock
+'''
+
+
+# Least recently used cache of loaded STL meshes bounded by memory use
+class MeshCache:
+        def __init__(self, max_bytes):
+                self.max_bytes = max_bytes
+                self.meshes = OrderedDict()  # (path, modified time) -> (name, geometry, normal), oldest first
+                self.size = 0  # Bytes of geometry currently held in the cache
+                self.hits = 0
+                self.misses = 0
+                self.lock = threading.Lock()
+
+        # Return the mesh of an STL file, reading it only when it is not already loaded or has changed on disk
+        def get(self, filename):
+                path = os.path.abspath(filename)
+                key = (path, os.path.getmtime(path))
+                with self.lock:
+                        if key in self.meshes:
+                                self.hits += 1
+                                self.meshes.move_to_end(key)
+                                return self.meshes[key]
+                        self.misses += 1
+
+                mesh = read_stl(path)
+                with self.lock:
+                        if key not in self.meshes:
+                                self.meshes[key] = mesh
+                                self.size += mesh[1].nbytes + mesh[2].nbytes
+                        # Drop the least recently used meshes until under the memory limit (always keep the newest)
+                        while self.size > self.max_bytes and len(self.meshes) > 1:
+                                _, old = self.meshes.popitem(last=False)
+                                self.size -= old[1].nbytes + old[2].nbytes
+                return mesh
+
+        def stats(self):
+                total = self.hits + self.misses
+                return {'meshes': len(self.meshes), 'bytes': self.size, 'hits': self.hits, 'misses': self.misses,
+                        'hit_rate': self.hits/total if total > 0 else 0.0}
+
+
+PERSPECTIVES = ('iso', 'di', 'tri')
+VIEWS = ('wire', 'hide', 'grey')
+ORTHO_VIEWS = ('top', 'bottom', 'left', 'right', 'front', 'back')
+TRANSFORM_SIZES = {'translate': 3, 'rotation': 2, 'zoom': 1}  # Numbers in the data of every gtransform.transform type
+
+
+# Return why the render settings of a request are invalid, or None if they can be rendered
+def request_error(request):
+        if request.get('persp', 'iso') not in PERSPECTIVES:
+                return 'persp must be one of ' + ', '.join(PERSPECTIVES)
+        if request.get('view', 'hide') not in VIEWS:
+                return 'view must be one of ' + ', '.join(VIEWS)
+        if request.get('ortho') and request['ortho'] not in ORTHO_VIEWS:
+                return 'ortho must be one of ' + ', '.join(ORTHO_VIEWS)
+        for name in ('fz', 'phi', 'theta'):
+                if not isinstance(request.get(name, 0), (int, float)):
+                        return name + ' must be a number'
+        transforms = request.get('transforms', [])
+        if not isinstance(transforms, list):
+                return 'transforms must be a list of [type, data] pairs'
+        for step in transforms:
+                if not (isinstance(step, list) and len(step) == 2):
+                        return 'transforms must be a list of [type, data] pairs'
+                transtype, data = step
+                if transtype == 'ortho':
+                        if data not in ORTHO_VIEWS:
+                                return 'ortho transform must be one of ' + ', '.join(ORTHO_VIEWS)
+                elif transtype not in TRANSFORM_SIZES:
+                        return 'unknown transform type: %s' % transtype
+                elif not (isinstance(data, list) and len(data) == TRANSFORM_SIZES[transtype] and
+                          all(isinstance(x, (int, float)) for x in data)):
+                        return '%s transform needs %d numbers' % (transtype, TRANSFORM_SIZES[transtype])
+                elif transtype == 'rotation' and data[0] not in (1, 2, 3):
+                        return 'rotation axis must be 1, 2 or 3'
+                elif transtype == 'zoom' and data[0] == 0:
+                        return 'zoom factor must not be 0'
+        return None
+
+
+# Render a request to PNG file data using the same pipeline as the GUI
+def render(cache, request):
+        width = int(request.get('width', 900))
+        height = int(request.get('height', 700))
+        view = request.get('view', 'hide')
+        _, geometry, normal = cache.get(request['file'])
+        geometry = orient(geometry, width, height)  # Orient object geometry in screen space
+
+        if request.get('ortho'):
+                # Transform the original geometry according to the selected orthographic view
+                geometry, normal = gtransform.transform(geometry, normal, 'ortho', request['ortho'])
+                camera = [0, 0, 1]
+        else:
+                for transtype, data in request.get('transforms', []):
+                        geometry, normal = gtransform.transform(geometry, normal, transtype, data)
+                # Apply selected perspective with appropriate settings of fz, phi, and theta
+                fz, phi, theta = (float(request.get(k, d)) for k, d in (('fz', 0.375), ('phi', 45), ('theta', 35)))
+                geometry, camera = gtransform.perspective(request.get('persp', 'iso'), geometry, fz, phi, theta)
+        points = draw_lines(geometry, normal, camera, view, width, height)
+        return imagewrite.png_bytes(rasterize(points, view, width, height))
+
+
+class RenderServer:
+        def __init__(self, cache_bytes, concurrency, max_pending, max_size=8192):
+                self.cache = MeshCache(cache_bytes)
+                self.max_size = max_size  # Largest image width or height allowed in pixels
+                self.executor = ThreadPoolExecutor(concurrency)
+                self.running = asyncio.Semaphore(concurrency)  # Renders running at once
+                self.max_pending = max_pending  # Requests allowed to run or wait for a free render slot at once
+                self.pending = 0
+                self.latency = deque(maxlen=10000)  # Most recent render request latencies in seconds
+                self.requests = 0
+                self.errors = 0
+                self.rejected = 0
+
+        def stats(self):
+                stats = {'requests': self.requests, 'errors': self.errors, 'rejected': self.rejected,
+                         'pending': self.pending, 'cache': self.cache.stats()}
+                if len(self.latency) > 0:
+                        p50, p95, p99 = np.percentile(np.array(self.latency), [50, 95, 99])
+                        stats['latency_ms'] = {'p50': 1000*p50, 'p95': 1000*p95, 'p99': 1000*p99,
+                                               'max': 1000*max(self.latency)}
+                return stats
+
+        # Answer a single request with a JSON header line and any image data
+        async def answer(self, line):
+                try:
+                        request = json.loads(line)
+                except ValueError as error:
+                        return {'ok': False, 'error': 'invalid JSON: ' + str(error)}, b''
+                if not isinstance(request, dict):
+                        return {'ok': False, 'error': 'request must be a JSON object'}, b''
+                cmd = request.get('cmd', 'render')
+                if cmd == 'stats':
+                        return dict(ok=True, **self.stats()), b''
+                if cmd != 'render':
+                        return {'ok': False, 'error': 'unknown cmd: %s' % cmd}, b''
+
+                self.requests += 1
+                # Check the image size before any pixel memory is allocated
+                try:
+                        width, height = int(request.get('width', 900)), int(request.get('height', 700))
+                except (TypeError, ValueError):
+                        self.errors += 1
+                        return {'ok': False, 'error': 'width and height must be integers'}, b''
+                if not (0 < width <= self.max_size and 0 < height <= self.max_size):
+                        self.errors += 1
+                        return {'ok': False, 'error': 'width and height must be 1 to %d pixels' % self.max_size}, b''
+                error = request_error(request)
+                if error is not None:
+                        self.errors += 1
+                        return {'ok': False, 'error': error}, b''
+                if self.pending >= self.max_pending:
+                        self.rejected += 1
+                        return {'ok': False, 'error': 'server busy'}, b''
+                start = time.perf_counter()
+                self.pending += 1
+                try:
+                        async with self.running:
+                                data = await asyncio.get_running_loop().run_in_executor(self.executor, render,
+                                                                                        self.cache, request)
+                except Exception as error:
+                        self.errors += 1
+                        return {'ok': False, 'error': '%s: %s' % (type(error).__name__, error)}, b''
+                finally:
+                        self.pending -= 1
+                elapsed = time.perf_counter() - start
+                self.latency.append(elapsed)
+                return {'ok': True, 'format': 'png', 'length': len(data), 'ms': 1000*elapsed}, data
+
+        async def handle(self, reader, writer):
+                # Serve requests from a client connection until it is closed
+                while True:
+                        line = await reader.readline()
+                        if not line:
+                                break
+                        header, data = await self.answer(line)
+                        header.setdefault('length', len(data))
+                        writer.write(json.dumps(header).encode() + b'\n' + data)
+                        await writer.drain()
+                writer.close()
+
+
+# Send a single request to a running server and return the response header and image data
+def send_request(address, payload):
+        if isinstance(address, str):
+                client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        else:
+                client = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        client.connect(address)
+        client.sendall(json.dumps(payload).encode() + b'\n')
+        fp = client.makefile('rb')
+        header = json.loads(fp.readline())
+        data = fp.read(header['length'])
+        fp.close()
+        client.close()
+        return header, data
+
+
+async def serve(args):
+        server = RenderServer(int(args.cache_mb*1024*1024), args.concurrency, args.max_pending, args.max_size)
+        if args.socket:
+                listener = await asyncio.start_unix_server(server.handle, path=args.socket)
+                print('Listening on ' + args.socket)
+        else:
+                listener = await asyncio.start_server(server.handle, host='127.0.0.1', port=args.port)
+                print('Listening on 127.0.0.1:%d' % args.port)
+        async with listener:
+                await listener.serve_forever()
+
+
+def main():
+        parser = argparse.ArgumentParser(description='Local render server for ASCII STL files')
+        parser.add_argument('--port', type=int, default=8765, help='localhost TCP port to listen on')
+        parser.add_argument('--socket', default=None, help='Unix domain socket path to listen on instead of a port')
+        parser.add_argument('--cache-mb', type=float, default=512, help='memory limit of the mesh cache in MB')
+        parser.add_argument('--concurrency', type=int, default=4, help='number of renders running at once')
+        parser.add_argument('--max-pending', type=int, default=64,
+                            help='number of requests allowed to run or wait at once')
+        parser.add_argument('--max-size', type=int, default=8192, help='largest image width or height in pixels')
+        args = parser.parse_args()
+        try:
+                asyncio.run(serve(args))
+        except KeyboardInterrupt:
+                pass
+
+
+if __name__ == '__main__':
+        main()
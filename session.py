@@ -0,0 +1,156 @@
+import numpy as np
+import argparse
+import json
+import time
+
+'''
+Code to record interactive viewer sessions and replay them without the GUI to measure frame latency
+ - The viewer records every opened file, transformation (keys, buttons and menus), recenter, setting change and
+   cross section plane step with the time since the recording started, saved as one line of JSON per event
+ - The replay runner draws the recorded events for a given STL or scene file through the same DrawObject pipeline
+   as the viewer (with the pixel array kept in memory instead of shown on screen)
+ - Reports the per-frame latency percentiles and the total number of pixels drawn so that two builds can be
+   compared on an identical workload
+
+Usage: python session.py recording.session model.stl [--realtime] [--json]
+'''
+
+
+# Record timestamped viewer events
+class SessionRecorder:
+        def __init__(self):
+                self.start = time.perf_counter()
+                self.events = []
+
+        def record(self, kind, **data):
+                data['t'] = time.perf_counter() - self.start  # Seconds since the recording started
+                data['kind'] = kind
+                self.events.append(data)
+
+        def save(self, filename):
+                fp = open(filename, 'w')
+                for event in self.events:
+                        fp.write(json.dumps(event) + '\n')
+                fp.close()
+
+
+def load_session(filename):
+        fp = open(filename, 'r')
+        events = [json.loads(line) for line in fp.readlines() if line.strip()]
+        fp.close()
+        return events
+
+
+# Value holder with the same get/set as the Tk variables of the viewer settings
+class Setting:
+        def __init__(self, value):
+                self.value = value
+
+        def get(self):
+                return self.value
+
+        def set(self, value):
+                self.value = value
+
+
+# Replay a recorded session against an STL or scene file and return the latency of every frame and pixels drawn
+def replay(events, filename, realtime=False):
+        import GUI
+        GUI.load_modules()
+
+        # DrawObject that keeps the pixel array in memory instead of showing it on screen
+        class HeadlessDrawObject(GUI.DrawObject):
+                pixels = 0  # Total number of line pixels drawn
+
+                def plot_points(self, loc, plot_geometry):
+                        self.pxarray = GUI.rasterize(plot_geometry, GUI.view.get(), GUI.embed_w, GUI.embed_h)
+                        self.pixels += plot_geometry.shape[0]
+
+        # Same default settings as the viewer
+        GUI.persp, GUI.view = Setting('iso'), Setting('hide')
+        GUI.phi, GUI.theta, GUI.fz, GUI.feature_angle = Setting(45.0), Setting(35.0), Setting(0.375), Setting(30.0)
+
+        def open_file():
+                if filename.lower().endswith('.scene'):
+                        from scene import Scene
+                        scene = Scene()
+                        scene.load_scene(filename)
+                        return HeadlessDrawObject(scene=scene)
+                return HeadlessDrawObject(filename)
+
+        stlobject = None
+        latency = []
+        pixels = 0
+        start = time.perf_counter()
+        for event in events:
+                kind = event['kind']
+                if realtime:
+                        # Wait until the recorded time of the event
+                        time.sleep(max(0.0, event['t'] - (time.perf_counter() - start)))
+                if kind == 'settings':
+                        for name in ('persp', 'view', 'fz', 'phi', 'theta', 'feature_angle'):
+                                if name in event:
+                                        getattr(GUI, name).set(event[name])
+                        continue
+                if kind not in ('open', 'recenter', 'plot', 'section', 'replot'):
+                        continue
+                if kind == 'open':
+                        # The recorded file is replaced by the file given for the replay
+                        if stlobject is not None:
+                                pixels += stlobject.pixels
+                        stlobject = open_file()
+                if stlobject is None or (kind in ('section', 'replot') and stlobject.scene is not None):
+                        continue  # Sections are only cut through single STL objects
+
+                frame = time.perf_counter()
+                if kind == 'plot':
+                        stlobject.plot_transform(None, event['transtype'], event['data'])
+                elif kind == 'section':
+                        stlobject.pxarray, points, _ = stlobject.section_pixels(event['normal'], event['position'],
+                                                                                event['clipped'])
+                        stlobject.pixels += points
+                elif kind == 'replot':
+                        stlobject.replot(None)
+                else:
+                        stlobject.initial_plot(None)
+                latency.append(time.perf_counter() - frame)
+
+        if stlobject is not None:
+                pixels += stlobject.pixels
+        return latency, pixels
+
+
+# Summarize frame latencies (milliseconds) and pixels drawn
+def report(latency, pixels):
+        result = {'frames': len(latency), 'pixels': pixels}
+        if len(latency) > 0:
+                ms = 1000*np.array(latency)
+                p50, p95, p99 = np.percentile(ms, [50, 95, 99])
+                result.update({'p50_ms': p50, 'p95_ms': p95, 'p99_ms': p99, 'mean_ms': np.mean(ms),
+                               'max_ms': np.max(ms), 'total_s': np.sum(ms)/1000})
+        return result
+
+
+def main():
+        parser = argparse.ArgumentParser(description='Replay a recorded viewer session and report frame latency')
+        parser.add_argument('session', help='session file recorded by the viewer (File > Start Recording)')
+        parser.add_argument('file', help='STL or scene file to replay the session against')
+        parser.add_argument('--realtime', action='store_true', help='wait for the recorded time of every event')
+        parser.add_argument('--json', action='store_true', help='print the report as JSON')
+        args = parser.parse_args()
+
+        latency, pixels = replay(load_session(args.session), args.file, args.realtime)
+        result = report(latency, pixels)
+        if args.json:
+                print(json.dumps(result))
+        elif result['frames'] == 0:
+                print('No frames drawn')
+        else:
+                print('Frames: %d' % result['frames'])
+                print('Latency p50 / p95 / p99: %.1f / %.1f / %.1f ms (mean %.1f ms, max %.1f ms)'
+                      % (result['p50_ms'], result['p95_ms'], result['p99_ms'], result['mean_ms'], result['max_ms']))
+                print('Total pixels drawn: %d' % result['pixels'])
+
+
+if __name__ == '__main__':
+        main()
@@ -0,0 +1,43 @@
+import numpy as np
+
+'''
+Code to read the face geometry and outward normals of an ASCII STL file
+ - Returns the embedded solid name, the vertices in form [x y z h] and the face normals in form [x y z h]
+ - Every 3 rows of the vertex array represents a single face with the matching row of the normal array
+ - Geometry is returned as stored in the file (not centered or scaled for the display window)
+'''
+
+
+# Load ASCII STL File (no Binary STLs - based on project requirements)
+def read_stl(filename):
+        geometry = []  # Vertex data for every face
+        normal = []  # Outward normal data for every face
+        name = ''  # Embedded STL model name
+        normal_face = []
+        triangle = []
+        fp = open(filename, 'r')  # Open and read selected file into memory
+
+        # Loop over each line in the STL file
+        for line in fp.readlines():
+                parts = line.split()  # Split line into parts by spaces
+                if len(parts) > 0:
+                        # Start of filename, store embedded filename
+                        if parts[0] == 'solid':
+                                name = line[6:-1]
+                        # Beginning of a new face - store normals and begin new triangle variable
+                        if parts[0] == 'facet':
+                                triangle = []
+                                # Select face normal components
+                                normal_face = (float(parts[2]), float(parts[3]), float(parts[4]), 1)
+                        # Store all the vertex points in 'triangle'
+                        if parts[0] == 'vertex':
+                                triangle.append((float(parts[1]), float(parts[2]), float(parts[3]), 1))
+                        # End of face - append new face to the model data
+                        if parts[0] == 'endloop':
+                                geometry.append([triangle[0], triangle[1], triangle[2]])
+                                normal.append(normal_face)
+        fp.close()
+        # Convert lists to numpy arrays of the correct dimensions (Nx4 matrices)
+        normal = np.asarray(normal, dtype=float).reshape((-1, 4))
+        geometry = np.asarray(geometry, dtype=float).reshape((-1, 4))
+        return name, geometry, normal
@@ -0,0 +1,154 @@
+import numpy as np
+import argparse
+import os
+import time
+import gtransform
+import imagewrite
+from orient import orient
+from drawlines import segment_pixels
+from edges import EdgeSet
+from stlfile import read_stl
+
+'''
+Code to export very high resolution images (16k x 16k and larger) of an STL file one tile at a time
+ - Projects the object once and collects the edges to draw as line segments in image pixel coordinates
+ - Bins every segment into the tiles covered by its bounding box in one pass (sorted by tile)
+ - Rasterizes the segments of one tile at a time and streams the tiles to disk, so memory for pixels is bounded
+   by the tile size rather than the image size
+ - Tiled TIFF output (.tif) holds one tile of pixels at a time, PNG output (.png) holds one row of tiles at a time
+   since PNG images must be written top to bottom a full image row at a time
+
+Usage: python tiled.py model.stl poster.tif --size 16384 16384 --tile 1024
+'''
+
+
+# Project an STL file and return the segments to draw [x1 y1 x2 y2] in image pixels and whether each is camera facing
+def project_segments(filename, persp, fz, phi, theta, view, width, height, feature_angle=30):
+        _, geometry, normal = read_stl(filename)
+        geometry = orient(geometry, width, height)  # Orient object geometry in screen space
+        projected, camera = gtransform.perspective(persp, geometry, fz, phi, theta)
+        xy = projected[:, 0:2] + [width/2, height/2]  # Image pixel coordinates (0,0 of image is top left)
+
+        if view == 'edge':
+                # Only the feature and silhouette edges
+                edges = EdgeSet(geometry)
+                visible, _ = edges.visible(normal, camera, feature_angle)
+                points = edges.points[visible]
+                segments = np.concatenate((xy[points[:, 0]], xy[points[:, 1]]), axis=1)
+                return segments, np.ones(segments.shape[0], dtype=bool)
+
+        # The 3 edges of every face drawn for the view type (same face test as draw_lines)
+        front = np.dot(normal[:, 0:3], camera) < 0.0
+        keep = front if view == 'hide' else np.ones(front.shape, dtype=bool)
+        tri = xy.reshape((-1, 3, 2))[keep]
+        segments = np.concatenate((np.concatenate((tri[:, 0], tri[:, 1]), axis=1),
+                                   np.concatenate((tri[:, 1], tri[:, 2]), axis=1),
+                                   np.concatenate((tri[:, 2], tri[:, 0]), axis=1)))
+        front = np.tile(front[keep] | (view == 'wire'), 3)  # Wireframe draws every line black
+        return segments, front
+
+
+# Bin the segments by the tiles covered by their bounding boxes, returning segment numbers sorted by tile and
+# the start of every tile in that list
+def bin_segments(segments, tile, tiles_x, tiles_y):
+        # Use the rounded end points that segment_pixels draws from so every tile with pixels of a segment gets it
+        start, end = np.around(segments[:, 0:2]), np.around(segments[:, 2:4])
+        low = np.floor(np.minimum(start, end)/tile).astype(int)
+        high = np.floor(np.maximum(start, end)/tile).astype(int)
+        low = np.clip(low, 0, [tiles_x - 1, tiles_y - 1])
+        high = np.clip(high, 0, [tiles_x - 1, tiles_y - 1])
+        span = high - low + 1
+        counts = span[:, 0]*span[:, 1]  # Number of tiles in the bounding box of every segment
+
+        # One entry per (segment, tile) pair
+        index = np.repeat(np.arange(segments.shape[0]), counts)
+        k = np.arange(index.shape[0]) - np.repeat(np.cumsum(counts) - counts, counts)
+        tile_x = low[index, 0] + k % span[index, 0]
+        tile_y = low[index, 1] + k//span[index, 0]
+        tile_id = tile_y*tiles_x + tile_x
+        order = np.argsort(tile_id, kind='stable')
+        starts = np.concatenate(([0], np.cumsum(np.bincount(tile_id, minlength=tiles_x*tiles_y))))
+        return index[order], starts
+
+
+# Rasterize the binned segments of a single tile into rows [y][x] of RGB pixels
+def render_tile(segments, front, view, x0, y0, tile_w, tile_h):
+        rows = np.full((tile_h, tile_w, 3), 255, dtype=np.uint8)  # Clear tile to white
+        x, y, index = segment_pixels(segments, x0, x0 + tile_w - 1, y0, y0 + tile_h - 1)
+        x, y = x - x0, y - y0
+        # Grey lines first so that black lines always cover them
+        if view == 'grey':
+                back = ~front[index]
+                rows[y[back], x[back]] = (210, 210, 210)
+        black = front[index]
+        rows[y[black], x[black]] = (0, 0, 0)
+        return rows
+
+
+# Render an STL file to a tiled TIFF (.tif/.tiff) or PNG file of any size
+def export(filename, output, width, height, tile=1024, persp='iso', fz=0.375, phi=45, theta=35, view='hide',
+           feature_angle=30):
+        if tile <= 0:
+                raise ValueError('Tile size must be positive: %d' % tile)
+        segments, front = project_segments(filename, persp, fz, phi, theta, view, width, height, feature_angle)
+        tiles_x, tiles_y = -(-width//tile), -(-height//tile)
+        order, starts = bin_segments(segments, tile, tiles_x, tiles_y)
+
+        tiff = output.lower().endswith(('.tif', '.tiff'))
+        fp = open(output, 'wb')
+        try:
+                if tiff:
+                        writer = imagewrite.TIFFWriter(fp, width, height, tile)
+                else:
+                        writer = imagewrite.PNGWriter(fp, width, height)
+        except ValueError:
+                # Do not leave an empty image behind for a tile size the TIFF writer refuses
+                fp.close()
+                os.remove(output)
+                raise
+        for ty in range(tiles_y):
+                tile_h = min(tile, height - ty*tile)
+                strip = None if tiff else np.empty((tile_h, width, 3), dtype=np.uint8)
+                for tx in range(tiles_x):
+                        tile_w = min(tile, width - tx*tile)
+                        binned = order[starts[ty*tiles_x + tx]:starts[ty*tiles_x + tx + 1]]
+                        rows = render_tile(segments[binned], front[binned], view, tx*tile, ty*tile, tile_w, tile_h)
+                        if tiff:
+                                writer.write_tile(rows)
+                        else:
+                                strip[:, tx*tile:tx*tile + tile_w] = rows
+                if not tiff:
+                        writer.write_rows(strip)
+        writer.close()
+        fp.close()
+        return segments.shape[0], tiles_x*tiles_y
+
+
+def main():
+        parser = argparse.ArgumentParser(description='Export a very high resolution image of an ASCII STL file')
+        parser.add_argument('stl', help='STL file to render')
+        parser.add_argument('output', help='output image (.tif for a tiled TIFF or .png)')
+        parser.add_argument('--size', type=int, nargs=2, default=[16384, 16384], metavar=('WIDTH', 'HEIGHT'))
+        parser.add_argument('--tile', type=int, default=1024, help='tile size in pixels (multiple of 16 for TIFF)')
+        parser.add_argument('--persp', default='iso', choices=['iso', 'di', 'tri'], help='perspective')
+        parser.add_argument('--fz', type=float, default=0.375, help='dimetric fz setting')
+        parser.add_argument('--phi', type=float, default=45, help='trimetric phi setting')
+        parser.add_argument('--theta', type=float, default=35, help='trimetric theta setting')
+        parser.add_argument('--view', default='hide', choices=['wire', 'hide', 'grey', 'edge'],
+                            help='hidden line view type')
+        parser.add_argument('--angle', type=float, default=30, help='feature edge angle in degrees (edge view)')
+        args = parser.parse_args()
+        if args.tile <= 0:
+                parser.error('--tile must be positive')
+        if args.output.lower().endswith(('.tif', '.tiff')) and args.tile % 16 != 0:
+                parser.error('--tile must be a multiple of 16 for TIFF output')
+
+        start = time.perf_counter()
+        num_segments, num_tiles = export(args.stl, args.output, args.size[0], args.size[1], args.tile, args.persp,
+                                         args.fz, args.phi, args.theta, args.view, args.angle)
+        print('Exported %d x %d image (%d lines, %d tiles) in %.2f s' % (args.size[0], args.size[1], num_segments,
+                                                                         num_tiles, time.perf_counter() - start))
+
+
+if __name__ == '__main__':
+        main()
@@ -0,0 +1,111 @@
+import numpy as np
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+import gtransform
+import imagewrite
+from orient import orient
+from drawlines import draw_lines, rasterize
+from stlfile import read_stl
+
+'''
+Code to export a 360 degree turntable animation of an STL file without the GUI
+ - Builds the view matrices of every frame of the orbit (rotation about the chosen axis followed by the perspective)
+ - Projects the geometry of a batch of frames at once with a single matrix product instead of re-transforming
+   the model one frame at a time
+ - Draws, rasterizes and encodes the frames in parallel worker processes, with at most 2 batches of frames in
+   flight so that memory does not grow with the number of frames
+ - Writes a numbered PNG image sequence or an animated GIF (each frame as soon as it is ready) and reports the
+   export frames per second
+
+Usage: python turntable.py model.stl output.gif --frames 120
+       python turntable.py model.stl frames/turntable.png  (writes frames/turntable_0001.png, ...)
+'''
+
+
+# Build the rotation and full projection matrices for every frame of an orbit about an axis (1 = x, 2 = y, 3 = z)
+def view_matrices(persp, fz, phi, theta, frames, axis):
+        rot, camera = gtransform.perspective_matrix(persp, fz, phi, theta)
+        spin = np.array([gtransform.rotation(np.identity(4), np.identity(4), axis, 360.0*f/frames)[0]
+                         for f in range(frames)])
+        return spin, np.matmul(spin, rot.dot(gtransform.FLAT)), camera
+
+
+# Draw, rasterize and encode a single projected frame (run in the worker processes)
+def render_frame(job):
+        geometry, normals, camera, view, width, height, fmt = job
+        pixels = rasterize(draw_lines(geometry, normals, camera, view, width, height), view, width, height)
+        if fmt == 'gif':
+                return imagewrite.gif_frame(pixels)
+        return imagewrite.png_bytes(pixels)
+
+
+# Render every frame of a turntable orbit of an STL file, yielding the encoded PNG or GIF frame data in order
+def turntable(filename, frames, persp='iso', fz=0.375, phi=45, theta=35, view='hide', width=900, height=700,
+              axis=2, fmt='png', batch=16, workers=None):
+        if frames < 1:
+                raise ValueError('Turntable needs at least 1 frame: %d' % frames)
+        _, geometry, normal = read_stl(filename)
+        geometry = orient(geometry, width, height)  # Orient object geometry in screen space
+        spin, mats, camera = view_matrices(persp, fz, phi, theta, frames, axis)
+
+        pool = ProcessPoolExecutor(workers)
+        try:
+                previous = []
+                for start in range(0, frames, batch):
+                        # Project every frame of the batch in one pass (batch x points x 4)
+                        projected = np.matmul(geometry, mats[start:start+batch])
+                        normals = np.matmul(normal, spin[start:start+batch])
+                        jobs = [pool.submit(render_frame, (projected[f], normals[f], camera, view, width, height, fmt))
+                                for f in range(projected.shape[0])]
+                        del projected, normals
+                        # Collect the previous batch while this one renders (at most 2 batches in flight)
+                        for job in previous:
+                                yield job.result()
+                        previous = jobs
+                for job in previous:
+                        yield job.result()
+        finally:
+                pool.shutdown(cancel_futures=True)
+
+
+def main():
+        parser = argparse.ArgumentParser(description='Export a turntable animation of an ASCII STL file')
+        parser.add_argument('stl', help='STL file to render')
+        parser.add_argument('output', help='animated .gif file, or .png name of the numbered image sequence')
+        parser.add_argument('--frames', type=int, default=120, help='number of frames in the full orbit')
+        parser.add_argument('--axis', type=int, default=2, choices=[1, 2, 3], help='orbit axis (1 = x, 2 = y, 3 = z)')
+        parser.add_argument('--persp', default='iso', choices=['iso', 'di', 'tri'], help='perspective')
+        parser.add_argument('--fz', type=float, default=0.375, help='dimetric fz setting')
+        parser.add_argument('--phi', type=float, default=45, help='trimetric phi setting')
+        parser.add_argument('--theta', type=float, default=35, help='trimetric theta setting')
+        parser.add_argument('--view', default='hide', choices=['wire', 'hide', 'grey'], help='hidden line view type')
+        parser.add_argument('--size', type=int, nargs=2, default=[900, 700], metavar=('WIDTH', 'HEIGHT'))
+        parser.add_argument('--delay', type=int, default=40, help='GIF delay between frames in milliseconds')
+        parser.add_argument('--workers', type=int, default=None, help='number of worker processes')
+        args = parser.parse_args()
+        if args.frames < 1:
+                parser.error('--frames must be at least 1')
+
+        fmt = 'gif' if args.output.lower().endswith('.gif') else 'png'
+        width, height = args.size
+        start = time.perf_counter()
+        encoded = turntable(args.stl, args.frames, args.persp, args.fz, args.phi, args.theta, args.view, width, height,
+                            args.axis, fmt, workers=args.workers)
+        if fmt == 'gif':
+                # Frames are written to the GIF as they are ready
+                imagewrite.write_gif(args.output, encoded, width, height, args.delay)
+        else:
+                # Write numbered image sequence (name_0001.png, name_0002.png, ...) as each frame is ready
+                root = os.path.splitext(args.output)[0]
+                for f, data in enumerate(encoded):
+                        fp = open('%s_%04d.png' % (root, f + 1), 'wb')
+                        fp.write(data)
+                        fp.close()
+        elapsed = time.perf_counter() - start
+        print('Exported %d frames in %.2f s (%.1f frames per second)' % (args.frames, elapsed, args.frames/elapsed))
+
+
+if __name__ == '__main__':
+        main()